@@ -1,17 +1,40 @@
 import os
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, render_template, request, jsonify, redirect, url_for, Response, g, abort, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import text
-from datetime import datetime, timezone
+from sqlalchemy import text, inspect, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import contains_eager, joinedload, load_only
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime, timedelta, timezone
 import feedparser
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from apscheduler.schedulers.background import BackgroundScheduler
 import logging
 import hashlib
-from urllib.parse import urljoin, urlparse
+import json
+import uuid
+import queue
+import atexit
+import sqlite3
+import zlib
+import xml.etree.ElementTree as ET
+import calendar
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
 import re
 import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from contextlib import contextmanager
+from collections import Counter, OrderedDict, namedtuple
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import accumulate
+from operator import attrgetter
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -19,11 +42,78 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///rss_feeds.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('RSS_DATABASE_URI', 'sqlite:///rss_feeds.db')  # 基准测试等场景通过环境变量指定其他数据库
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLITE_JOURNAL_MODE'] = 'WAL'  # WAL 模式下读操作不会被写事务阻塞
+app.config['SQLITE_BUSY_TIMEOUT'] = 30  # 等待数据库写锁的最长时间（秒）
+app.config['INGEST_BATCH_SIZE'] = 20  # 写线程每个事务最多合并的写任务数
+app.config['READ_FLUSH_SECONDS'] = 2  # 已读状态缓冲写入数据库的间隔（秒）
+app.config['READ_BUFFER_MAX'] = 200  # 缓冲的已读文章数达到这个数量时立即写入
+app.config['RSS_FETCH_WORKERS'] = 8  # 并发抓取线程数，设为1时退回串行抓取
+app.config['RSS_FETCH_PER_HOST'] = 2  # 同一主机同时进行的最大请求数
+app.config['FETCH_CHECK_SECONDS'] = 60  # 调度器检查到期RSS源的间隔（秒）
+app.config['FETCH_DEFAULT_INTERVAL'] = 2 * 3600  # 无法估计发文频率时的抓取间隔（秒）
+app.config['FETCH_MIN_INTERVAL'] = 15 * 60  # 单个RSS源的最短抓取间隔（秒）
+app.config['FETCH_MAX_INTERVAL'] = 24 * 3600  # 单个RSS源的最长抓取间隔（秒）
+app.config['FETCH_POLLS_PER_POST'] = 4  # 平均每篇文章的发布间隔内抓取几次
+app.config['FEED_INITIAL_ENTRIES'] = 20  # 新RSS源第一次抓取处理的文章数，其余的由后台回填
+app.config['FEED_HIGH_WATER_GRACE'] = 24 * 3600  # 发布时间早于高水位超过这个秒数的条目视为已经处理过
+app.config['BACKFILL_ENABLED'] = True  # 是否在后台回填新RSS源的历史文章
+app.config['BACKFILL_MAX_PAGES'] = 10  # 每个RSS源回填时最多读取的页数（RFC 5005 分页）
+app.config['BACKFILL_MAX_ENTRIES'] = 500  # 每个RSS源回填的文章数上限
+app.config['BACKFILL_BATCH_SIZE'] = 50  # 回填时每个写事务处理的文章数
+app.config['BACKFILL_SOURCES_PER_RUN'] = 2  # 每轮最多回填的RSS源数
+app.config['BACKFILL_CHECK_SECONDS'] = 300  # 调度器检查待回填RSS源的间隔（秒）
+app.config['ARTICLE_PAGINATION'] = 'cursor'  # 文章列表分页方式：cursor（游标）或 page（页码）
+app.config['ARTICLES_PER_PAGE'] = 20
+app.config['API_MAX_LIMIT'] = 200  # /api/articles 每页最多返回的文章数
+app.config['API_EXPORT_CHUNK'] = 500  # NDJSON 导出时每次查询的文章数
+app.config['PAGE_CACHE_SIZE'] = 128  # 缓存的首页渲染结果数量，0 表示不缓存
+app.config['PAGE_CACHE_TTL'] = 60  # 缓存的最长有效期（秒），兜底其他进程（如命令行）写入的数据
+app.config['EXTRACTION_ENABLED'] = True  # 是否在后台提取文章全文
+app.config['EXTRACTION_WORKERS'] = 4  # 全文提取的并发线程数
+app.config['EXTRACTION_BATCH_SIZE'] = 20  # 每轮最多处理的任务数
+app.config['EXTRACTION_HOST_INTERVAL'] = 2.0  # 同一主机两次请求之间的最小间隔（秒）
+app.config['EXTRACTION_MAX_ATTEMPTS'] = 3  # 单篇文章的最大尝试次数，超过后标记为失败
+app.config['OPML_VALIDATE_WORKERS'] = 16  # 导入OPML时并发检查RSS源的线程数
+app.config['SUMMARY_PROCESSES'] = max((os.cpu_count() or 1) - 1, 0)  # 清理描述和生成摘要的进程数，0 表示在当前进程中执行
+app.config['SUMMARY_CHUNK_SIZE'] = 50  # 批量生成摘要时每个进程任务包含的文章数
+app.config['SUMMARY_CACHE_SIZE'] = 100000  # 摘要缓存表最多保留的条目数，超出时删除最久未使用的，0 表示不缓存
+app.config['SUMMARY_CACHE_EVICT_SECONDS'] = 600  # 调度器淘汰超出数量的摘要缓存的间隔（秒）
+app.config['RESUMMARIZE_BATCH_SIZE'] = 500  # flask resummarize 每批检查的文章数
+app.config['HTTP_CONNECT_TIMEOUT'] = 5  # 建立连接的超时（秒）
+app.config['HTTP_READ_TIMEOUT'] = 15  # 两次收到数据之间的最长等待（秒）
+app.config['HTTP_TOTAL_TIMEOUT'] = 30  # 单个请求下载响应体的总时长上限（秒）
+app.config['HTTP_MAX_RESPONSE_BYTES'] = 5 * 1024 * 1024  # 响应体大小上限，超过时中止下载
+app.config['HTTP_POOL_HOSTS'] = 256  # 连接池最多为多少个主机保留keep-alive连接，超出时丢弃最久未用主机的连接
+app.config['HTTP_POOL_SIZE'] = 10  # 每个主机最多保留的keep-alive连接数
+app.config['NEAR_DUPLICATE_ENABLED'] = True  # 入库时检测不同RSS源转载的近似重复文章
+app.config['NEAR_DUPLICATE_DISTANCE'] = 3  # SimHash 汉明距离不超过这个值视为重复，最大为3
+app.config['NEAR_DUPLICATE_MIN_FEATURES'] = 8  # 标题和描述中的词数少于这个值时不做检测
+app.config['ARCHIVE_ENABLED'] = True  # 是否定期把旧文章移入压缩归档表
+app.config['ARCHIVE_AFTER_DAYS'] = 180  # 发布超过这个天数的文章归档，None 表示不按发布时间归档
+app.config['ARCHIVE_READ_AFTER_DAYS'] = 30  # 已读且入库超过这个天数的文章归档，None 表示不按已读状态归档
+app.config['ARCHIVE_BATCH_SIZE'] = 200  # 每个事务归档的文章数，保持写事务短小
+app.config['ARCHIVE_MAX_BATCHES'] = 50  # 每轮最多归档的批数，剩下的留到下一轮
+app.config['ARCHIVE_CHECK_SECONDS'] = 3600  # 调度器执行归档的间隔（秒）
 
 db = SQLAlchemy(app)
 
+@event.listens_for(Engine, 'connect')
+def configure_sqlite(dbapi_connection, connection_record):
+    """为每个新的SQLite连接设置日志模式和等待超时"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {int(app.config['SQLITE_BUSY_TIMEOUT'] * 1000)}")
+    cursor.execute(f"PRAGMA journal_mode = {app.config['SQLITE_JOURNAL_MODE']}")
+    if app.config['SQLITE_JOURNAL_MODE'].upper() == 'WAL':
+        # WAL 模式下 NORMAL 只在检查点时同步磁盘，断电最多丢失最近的事务，不会损坏数据库
+        cursor.execute("PRAGMA synchronous = NORMAL")
+    cursor.execute("PRAGMA cache_size = -20000")  # 约20MB页缓存
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    cursor.close()
+
 # 数据库模型
 class RSSSource(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -33,14 +123,28 @@ class RSSSource(db.Model):
     active = db.Column(db.Boolean, default=True)
     last_updated = db.Column(db.DateTime, default=datetime.utcnow)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # 条件请求缓存：上次响应返回的校验信息
+    etag = db.Column(db.String(200))
+    last_modified = db.Column(db.String(100))
+    content_hash = db.Column(db.String(64))  # 响应内容的SHA-256，服务器不支持条件请求时使用
+    # 自适应抓取调度
+    next_fetch_at = db.Column(db.DateTime)  # 为空时表示下一轮立即抓取
+    fetch_interval = db.Column(db.Integer)  # 根据发文频率和服务器提示计算的抓取间隔（秒）
+    fetch_failures = db.Column(db.Integer, default=0)  # 连续失败次数，用于退避
+    # 增量处理：上次抓取时最新条目的GUID和发布时间，再次抓取时处理到这里为止
+    high_water_guid = db.Column(db.String(500))
+    high_water_published = db.Column(db.DateTime)
+    backfill_status = db.Column(db.String(20))  # 历史文章回填：pending / done / failed，为空表示不需要
 
 class Article(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(500), nullable=False)
-    url = db.Column(db.String(1000), nullable=False, unique=True)
+    url = db.Column(db.String(1000), nullable=False)
+    url_hash = db.Column(db.Integer)  # 规范化链接的64位哈希，用于去重
     description = db.Column(db.Text)
     content = db.Column(db.Text)
     summary = db.Column(db.Text)  # 新增：AI生成的文章摘要
+    summary_key = db.Column(db.Integer)  # 生成摘要时的输入和摘要版本的哈希，见 SummaryCache.key
     author = db.Column(db.String(100))
     published_date = db.Column(db.DateTime)
     source_id = db.Column(db.Integer, db.ForeignKey('rss_source.id'), nullable=False)
@@ -49,6 +153,675 @@ class Article(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     source = db.relationship('RSSSource', backref=db.backref('articles', lazy=True))
+    
+    __table_args__ = (
+        # 支持按 (published_date, id) 的游标分页
+        db.Index('ix_article_published_id', 'published_date', 'id'),
+        db.Index('ix_article_url_hash', 'url_hash', unique=True),
+        # 归档时选择已读的旧文章，见 ArticleArchive._conditions
+        db.Index('ix_article_read_created', 'read_status', 'created_at'),
+        # 归档或删除的文章ID不会再分配给新文章，归档表和 /article/<id> 链接不会冲突
+        {'sqlite_autoincrement': True},
+    )
+
+class ExtractionJob(db.Model):
+    """全文提取队列，每篇文章最多一条任务"""
+    id = db.Column(db.Integer, primary_key=True)
+    article_id = db.Column(db.Integer, db.ForeignKey('article.id'), nullable=False, unique=True)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending / running / done / failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_error = db.Column(db.String(500))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_extraction_job_status_next', 'status', 'next_attempt_at'),
+    )
+
+class ArticleFingerprint(db.Model):
+    """文章标题和描述的64位 SimHash，拆成4段16位分别建索引，用于查找近似重复的文章"""
+    article_id = db.Column(db.Integer, db.ForeignKey('article.id'), primary_key=True, autoincrement=False)
+    simhash = db.Column(db.Integer, nullable=False)  # 按有符号64位整数存储
+    band0 = db.Column(db.Integer, nullable=False)
+    band1 = db.Column(db.Integer, nullable=False)
+    band2 = db.Column(db.Integer, nullable=False)
+    band3 = db.Column(db.Integer, nullable=False)
+    
+    # 索引包含 simhash（article_id 是 rowid），查找候选时不需要回表
+    __table_args__ = tuple(
+        db.Index(f'ix_article_fingerprint_band{i}', f'band{i}', 'simhash') for i in range(4)
+    )
+
+class ArticleAlternate(db.Model):
+    """合并到已有文章的近似重复文章，只保留来源和链接"""
+    id = db.Column(db.Integer, primary_key=True)
+    article_id = db.Column(db.Integer, nullable=False, index=True)  # 保留的文章ID，文章归档后对应归档表中的同一ID
+    source_id = db.Column(db.Integer, db.ForeignKey('rss_source.id'), nullable=False)
+    title = db.Column(db.String(500), nullable=False)
+    url = db.Column(db.String(1000), nullable=False)
+    url_hash = db.Column(db.Integer)
+    distance = db.Column(db.Integer)  # 与保留文章的 SimHash 汉明距离
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    source = db.relationship('RSSSource')
+    
+    __table_args__ = (
+        db.Index('ix_article_alternate_url_hash', 'url_hash', unique=True),
+    )
+
+class ArchivedArticle(db.Model):
+    """归档的旧文章，沿用原文章ID，描述、正文和摘要压缩后存放在 payload 中"""
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(500), nullable=False)
+    url = db.Column(db.String(1000), nullable=False)
+    url_hash = db.Column(db.Integer)
+    author = db.Column(db.String(100))
+    published_date = db.Column(db.DateTime)
+    source_id = db.Column(db.Integer, db.ForeignKey('rss_source.id'), nullable=False)
+    tags = db.Column(db.String(500))
+    read_status = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    payload = db.Column(db.LargeBinary, nullable=False)  # zlib 压缩的 JSON：description / content / summary
+    
+    source = db.relationship('RSSSource')
+    
+    __table_args__ = (
+        db.Index('ix_archived_article_source', 'source_id'),
+        db.Index('ix_archived_article_url_hash', 'url_hash', unique=True),
+    )
+    
+    @staticmethod
+    def pack(description, content, summary):
+        data = json.dumps({'description': description, 'content': content, 'summary': summary}, ensure_ascii=False)
+        return zlib.compress(data.encode('utf-8'))
+    
+    @property
+    def texts(self):
+        """解压后的文本字段，每个对象只解压一次"""
+        if '_texts' not in self.__dict__:
+            self.__dict__['_texts'] = json.loads(zlib.decompress(self.payload).decode('utf-8'))
+        return self.__dict__['_texts']
+    
+    @property
+    def description(self):
+        return self.texts.get('description')
+    
+    @property
+    def content(self):
+        return self.texts.get('content')
+    
+    @property
+    def summary(self):
+        return self.texts.get('summary')
+
+class SummaryCacheEntry(db.Model):
+    """按输入内容缓存的摘要，条目数由 SUMMARY_CACHE_SIZE 限制，超出时删除最久未使用的"""
+    __tablename__ = 'summary_cache'
+    key = db.Column(db.Integer, primary_key=True, autoincrement=False)  # SummaryCache.key
+    summary = db.Column(db.Text, nullable=False)
+    last_used_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_summary_cache_last_used', 'last_used_at'),
+    )
+
+class CategoryStat(db.Model):
+    """按分类维护的文章数和未读数，供首页侧边栏使用
+    
+    入库、删除RSS源、清空数据和已读状态变化时在同一事务中增量更新，
+    可以用 `flask rebuild-counters` 从文章表重新统计。
+    """
+    category = db.Column(db.String(50), primary_key=True)
+    article_count = db.Column(db.Integer, nullable=False, default=0)
+    unread_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    @staticmethod
+    def apply(category, articles=0, unread=0):
+        """调整某个分类的计数，由调用方提交事务"""
+        if not articles and not unread:
+            return
+        table = CategoryStat.__table__
+        statement = sqlite_insert(table).values(category=category, article_count=articles, unread_count=unread)
+        statement = statement.on_conflict_do_update(
+            index_elements=['category'],
+            set_={
+                'article_count': table.c.article_count + articles,
+                'unread_count': table.c.unread_count + unread
+            }
+        )
+        db.session.execute(statement)
+    
+    @staticmethod
+    def rebuild():
+        """从文章表重新统计所有分类的计数"""
+        rows = db.session.query(
+            RSSSource.category,
+            db.func.count(Article.id),
+            db.func.sum(db.case((Article.read_status.is_(True), 0), else_=1))
+        ).join(Article).group_by(RSSSource.category).all()
+        
+        CategoryStat.query.delete()
+        db.session.add_all(
+            CategoryStat(category=category, article_count=total, unread_count=unread or 0)
+            for category, total, unread in rows
+        )
+        db.session.commit()
+        return len(rows)
+    
+    @staticmethod
+    def sidebar():
+        """返回 (分类, 文章数, 未读数) 列表，未读数扣除了还在缓冲区中的已读文章"""
+        stats = CategoryStat.query.filter(CategoryStat.article_count > 0).order_by(CategoryStat.category).all()
+        pending = ReadBuffer.unread_delta()
+        return [
+            (stat.category, stat.article_count, max(stat.unread_count - pending.get(stat.category, 0), 0))
+            for stat in stats
+        ]
+
+def mark_read_where(*conditions):
+    """把符合条件的未读文章标记为已读并同步未读计数，返回标记的数量，由调用方提交事务"""
+    source_ids = db.session.execute(
+        db.update(Article)
+        .where(Article.read_status.isnot(True), *conditions)
+        .values(read_status=True)
+        .returning(Article.source_id)
+    ).scalars().all()
+    if not source_ids:
+        return 0
+    
+    per_source = Counter(source_ids)
+    categories = dict(db.session.query(RSSSource.id, RSSSource.category).filter(RSSSource.id.in_(list(per_source))))
+    per_category = Counter()
+    for source_id, count in per_source.items():
+        per_category[categories.get(source_id)] += count
+    for category, count in per_category.items():
+        if category is not None:
+            CategoryStat.apply(category, unread=-count)
+    PageCache.touch()
+    return len(source_ids)
+
+def mark_article_read(article):
+    """把文章放入已读缓冲区，稍后批量写入数据库"""
+    if not article.read_status:
+        ReadBuffer.add(article.id, article.source.category)
+
+# 已读状态写缓冲
+class ReadBuffer:
+    """浏览文章和点击“标记已读”产生的已读状态先保存在内存中，
+    每隔 READ_FLUSH_SECONDS 秒或缓冲数量达到 READ_BUFFER_MAX 时，通过写线程一次性写入；
+    进程退出时写入剩余的部分。
+    
+    写入完成之前，首页通过 pending_ids() 和 unread_delta() 把缓冲中的文章显示为已读，
+    并从侧边栏的未读数中扣除。缓存的首页不会因为加入缓冲而失效，最多在 READ_FLUSH_SECONDS 秒内
+    仍显示为未读，写入提交后缓存失效。缓冲区在进程内，多进程部署时各进程只能看到自己的缓冲。
+    """
+    _lock = threading.Lock()
+    _flush_lock = threading.Lock()
+    _pending = {}  # 文章ID -> 分类
+    _flushing = {}  # 正在写入的部分，写入提交前仍然计入
+    _wakeup = threading.Event()
+    _thread = None
+    
+    @staticmethod
+    def add(article_id, category):
+        with ReadBuffer._lock:
+            if article_id in ReadBuffer._pending or article_id in ReadBuffer._flushing:
+                return
+            ReadBuffer._pending[article_id] = category
+            full = len(ReadBuffer._pending) >= app.config['READ_BUFFER_MAX']
+        # 这里不让首页缓存失效，否则每次浏览文章都会清空缓存；写入提交后由 mark_read_where 使缓存失效
+        ReadBuffer._ensure_started()
+        if full:
+            ReadBuffer._wakeup.set()
+    
+    @staticmethod
+    def pending_ids():
+        with ReadBuffer._lock:
+            return set(ReadBuffer._pending) | set(ReadBuffer._flushing)
+    
+    @staticmethod
+    def unread_delta():
+        """缓冲中每个分类的文章数"""
+        with ReadBuffer._lock:
+            return Counter(ReadBuffer._pending.values()) + Counter(ReadBuffer._flushing.values())
+    
+    @staticmethod
+    def discard():
+        """丢弃尚未写入的已读状态，全部标记已读之后调用"""
+        with ReadBuffer._lock:
+            ReadBuffer._pending.clear()
+    
+    @staticmethod
+    def _apply(article_ids):
+        marked = 0
+        for start in range(0, len(article_ids), INSERT_BATCH_SIZE * 10):
+            marked += mark_read_where(Article.id.in_(article_ids[start:start + INSERT_BATCH_SIZE * 10]))
+        return marked
+    
+    @staticmethod
+    def flush(direct=False):
+        """写入缓冲的已读状态；direct 为 True 时在当前线程中写入，用于进程退出"""
+        with ReadBuffer._flush_lock:
+            with ReadBuffer._lock:
+                if not ReadBuffer._pending:
+                    return 0
+                batch = ReadBuffer._pending
+                ReadBuffer._pending = {}
+                ReadBuffer._flushing.update(batch)
+            
+            try:
+                if direct:
+                    with app.app_context():
+                        marked = ReadBuffer._apply(list(batch))
+                        db.session.commit()
+                else:
+                    marked = IngestWriter.call(ReadBuffer._apply, list(batch))
+                logger.debug("已读状态写入 %d 篇文章", marked)
+                return marked
+            except Exception as e:
+                logger.error(f"写入已读状态时出错: {str(e)}")
+                # 放回缓冲区，下次重试
+                with ReadBuffer._lock:
+                    for article_id, category in batch.items():
+                        ReadBuffer._pending.setdefault(article_id, category)
+                return 0
+            finally:
+                with ReadBuffer._lock:
+                    for article_id in batch:
+                        ReadBuffer._flushing.pop(article_id, None)
+    
+    @staticmethod
+    def _ensure_started():
+        if ReadBuffer._thread is not None:
+            return
+        with ReadBuffer._lock:
+            if ReadBuffer._thread is None:
+                thread = threading.Thread(target=ReadBuffer._run, name='read-buffer')
+                thread.daemon = True
+                ReadBuffer._thread = thread
+                thread.start()
+    
+    @staticmethod
+    def _run():
+        while True:
+            ReadBuffer._wakeup.wait(app.config['READ_FLUSH_SECONDS'])
+            ReadBuffer._wakeup.clear()
+            ReadBuffer.flush()
+
+atexit.register(ReadBuffer.flush, direct=True)
+
+INSERT_BATCH_SIZE = 50  # 批量插入时每条语句包含的行数
+FEED_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# 摘要生成使用的关键词表
+# 技术领域分类和关键词
+TECH_CATEGORIES = {
+    '游戏引擎': ['unreal', 'unity', 'godot', 'engine', 'framework', 'runtime'],
+    '渲染技术': ['render', 'shader', 'graphics', 'gpu', 'vulkan', 'directx', 'opengl', 'lighting', 'shadow', 'material'],
+    '物理仿真': ['physics', 'collision', 'rigidbody', 'simulation', 'dynamics', 'constraint'],
+    '动画系统': ['animation', 'skeletal', 'blend', 'timeline', 'motion', 'ik', 'bone'],
+    '人工智能': ['ai', 'ml', 'neural', 'behavior', 'pathfinding', 'decision', 'learning'],
+    '性能优化': ['optimization', 'performance', 'profiling', 'memory', 'cpu', 'fps', 'bottleneck'],
+    '架构设计': ['architecture', 'pattern', 'design', 'component', 'system', 'modular', 'ecs'],
+    '网络编程': ['network', 'multiplayer', 'server', 'client', 'synchronization', 'latency'],
+    '虚拟现实': ['vr', 'ar', 'xr', 'virtual', 'augmented', 'headset', 'tracking'],
+    '工具开发': ['tool', 'editor', 'pipeline', 'automation', 'workflow', 'asset']
+}
+
+# 技术方法和实现关键词
+IMPLEMENTATION_KEYWORDS = [
+    'implement', 'algorithm', 'approach', 'method', 'technique', 'solution',
+    '实现', '算法', '方法', '技术', '解决方案', '策略'
+]
+
+# 问题和挑战关键词
+PROBLEM_KEYWORDS = [
+    'problem', 'issue', 'challenge', 'limitation', 'bottleneck', 'bug',
+    '问题', '挑战', '限制', '瓶颈', '困难', '缺陷'
+]
+
+# 结果和效果关键词
+RESULT_KEYWORDS = [
+    'result', 'performance', 'improvement', 'benefit', 'advantage', 'effect',
+    '结果', '性能', '改进', '优势', '效果', '提升'
+]
+
+# 新观点关键词
+ARGUMENT_KEYWORDS = ['新', 'new', '创新', 'innovative', '提出', 'propose']
+
+# 常见技术术语的中文替换
+TERM_REPLACEMENTS = {
+    'Unreal Engine': 'Unreal引擎',
+    'Unity': 'Unity引擎',
+    'rendering': '渲染',
+    'performance': '性能',
+    'optimization': '优化',
+    'shader': '着色器',
+    'physics': '物理',
+    'animation': '动画',
+    'AI': '人工智能',
+    'VR': '虚拟现实',
+    'AR': '增强现实',
+    'GPU': '图形处理器',
+    'CPU': '处理器',
+    'framework': '框架',
+    'algorithm': '算法',
+    'gameplay': '游戏玩法'
+}
+
+# 句子的分析结果，缓存后在多篇文章之间共享，所以用不可变的元组
+SentenceAnalysis = namedtuple('SentenceAnalysis', ['text', 'tech_areas', 'keywords', 'type', 'relevance_score'])
+
+class KeywordMatcher:
+    """预先构建的关键词匹配器，所有关键词表只在导入时处理一次
+    
+    匹配语义与逐个检查 `keyword in sentence` 完全相同（子串匹配），对关键词的内容没有限制。
+    只由小写字母组成的英文关键词只可能出现在小写句子的某个字母串中，所以每个句子只需切出字母串
+    （在C层完成：先编码为ASCII，再把字母以外的字节都换成空格后按空白切开），
+    每个字母串包含哪些关键词按字母串缓存；其他关键词（中文、含数字或符号的）逐个按子串检查，
+    中文关键词只在句子含有非ASCII字符时检查。
+    同一来源的文章常有相同的句子（模板化的开头结尾、正文中重复的描述），整句的分析结果也会缓存。
+    """
+    SENTENCE_TYPES = (('implementation', 3), ('problem', 2), ('result', 2), ('argument', 2))
+    
+    def __init__(self, tech_categories, impl_keywords, prob_keywords, result_keywords, argument_keywords):
+        # 按原来的遍历顺序展开 (领域, 关键词)，记下每个关键词在展开表中的位置，重复的关键词有多个位置
+        self.area_pairs = [(area, keyword) for area, keywords in tech_categories.items() for keyword in keywords]
+        self.positions = {}
+        for position, (area, keyword) in enumerate(self.area_pairs):
+            self.positions.setdefault(keyword, []).append(position)
+        # 每个关键词所属的优先级最高的句子类型
+        self.type_ranks = {}
+        for rank, keywords in enumerate((impl_keywords, prob_keywords, result_keywords, argument_keywords)):
+            for keyword in keywords:
+                self.type_ranks.setdefault(keyword, rank)
+        
+        keywords = dict.fromkeys([*self.positions, *self.type_ranks])
+        self.word_keywords = tuple((keyword.encode('ascii'), keyword) for keyword in keywords
+                                   if WORD_PATTERN.fullmatch(keyword))
+        self.ascii_keywords = tuple(keyword for keyword in keywords
+                                    if keyword.isascii() and not WORD_PATTERN.fullmatch(keyword))
+        self.other_keywords = tuple(keyword for keyword in keywords if not keyword.isascii())
+        # 用一个正则先判断句子中有没有中文关键词，大部分句子不需要逐个检查
+        self.other_pattern = re.compile('|'.join(map(re.escape, self.other_keywords)) or '(?!)')
+        
+        self.word_hits = lru_cache(maxsize=65536)(self._word_hits)
+        # 不同句子中出现的关键词组合很少，按组合缓存
+        self.keyword_analysis = lru_cache(maxsize=4096)(self._keyword_analysis)
+        # 分析句子的技术相关性和类型，返回 SentenceAnalysis
+        self.analyze = lru_cache(maxsize=65536)(self._analyze)
+    
+    def clear(self):
+        """清空所有缓存，基准测试用来测量冷启动的耗时"""
+        self.word_hits.cache_clear()
+        self.keyword_analysis.cache_clear()
+        self.analyze.cache_clear()
+    
+    def _word_hits(self, word):
+        """字母串中包含的英文关键词"""
+        return tuple(keyword for encoded, keyword in self.word_keywords if encoded in word)
+    
+    def _keyword_analysis(self, found):
+        """句子中出现的关键词对应的 (技术领域, 关键词, 句子类型, 关键词得分)，不含额外加分项"""
+        # 检查技术领域，按展开表中的顺序
+        pairs = [self.area_pairs[position]
+                 for position in sorted(position for keyword in found for position in self.positions.get(keyword, ()))]
+        tech_areas = tuple(area for area, keyword in pairs)
+        keywords = tuple(keyword for area, keyword in pairs)
+        score = 2 * len(pairs)
+        
+        # 确定句子类型，按实现、问题、结果、新观点的优先级
+        sentence_type = 'general'
+        ranks = [self.type_ranks[keyword] for keyword in found if keyword in self.type_ranks]
+        if ranks:
+            sentence_type, bonus = self.SENTENCE_TYPES[min(ranks)]
+            score += bonus
+        
+        return tech_areas, keywords, sentence_type, score
+    
+    def _analyze(self, sentence):
+        """与逐个关键词遍历的实现结果一致"""
+        sentence_lower = sentence.lower()
+        found = {keyword for keyword in self.ascii_keywords if keyword in sentence_lower}
+        if not sentence_lower.isascii() and self.other_pattern.search(sentence_lower):
+            found.update(keyword for keyword in self.other_keywords if keyword in sentence_lower)
+        words = sentence_lower.encode('ascii', 'replace').translate(NON_LETTER_BYTES).split()
+        found.update(*map(self.word_hits, set(words)))
+        tech_areas, keywords, sentence_type, score = self.keyword_analysis(frozenset(found))
+        
+        # 额外加分项
+        if NUMBER_PATTERN.search(sentence):  # 包含数字/百分比
+            score += 1
+        if 30 < len(sentence) < 150:  # 长度适中
+            score += 1
+        
+        return SentenceAnalysis(sentence, tech_areas, keywords, sentence_type, score)
+
+WORD_PATTERN = re.compile(r'[a-z]+')
+# 小写字母以外的字节都换成空格
+NON_LETTER_BYTES = bytes(byte if ord('a') <= byte <= ord('z') else ord(' ') for byte in range(256))
+SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?。！？]\s*')
+SHORTEN_SPLIT_PATTERN = re.compile(r'[.。]')
+# 等价于 \d+%|\d+倍|\d+x：数字串后面紧跟这些字符，当且仅当某个数字后面紧跟它们。
+# 先匹配后面的字符再回看数字，正则可以按首字符快速跳过，比逐个位置检查 \d 快
+NUMBER_PATTERN = re.compile(r'[%倍x](?<=\d.)')
+# 所有术语合并为一个正则一次替换；术语之间不会重叠，替换结果也不会再命中其他术语，因此与逐个替换结果相同。
+# 正则不用分组，匹配到的文本就是小写术语，直接查出替换结果
+TERM_LOWER = {term.lower(): value for term, value in TERM_REPLACEMENTS.items()}
+# 开头的前瞻列出所有术语的首字母，正则据此跳过不可能匹配的位置
+TERM_PATTERN_LOWER = re.compile(
+    '(?=[' + ''.join(sorted({re.escape(term[0]) for term in TERM_LOWER})) + r'])\b(?:'
+    + '|'.join(re.escape(term) for term in TERM_LOWER) + r')\b'
+)
+# 忽略大小写匹配时与小写字母等价的字符：ASCII大写字母，以及 re 文档列出的 İ、ı、ſ、K。
+# 逐个字符换成对应的小写字母，长度和 \w 属性都不变，在副本上区分大小写匹配等同于在原文上忽略大小写匹配
+TERM_CASE_FOLD = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ\u0130\u0131\u017f\u212a',
+                               'abcdefghijklmnopqrstuvwxyziisk')
+# 不含这四个字符时 str.lower() 同样逐字符对应、不会产生新的ASCII字母，可以代替较慢的 translate
+TERM_CASE_FOLD_PATTERN = re.compile('[\u0130\u0131\u017f\u212a]')
+KEYWORD_MATCHER = KeywordMatcher(TECH_CATEGORIES, IMPLEMENTATION_KEYWORDS, PROBLEM_KEYWORDS,
+                                 RESULT_KEYWORDS, ARGUMENT_KEYWORDS)
+
+# 摘要版本：修改摘要生成的代码后把 SUMMARY_REVISION 加一，关键词表的变化会自动反映在版本中，
+# 版本变化后缓存的摘要不再命中，flask resummarize 会重新生成旧版本的摘要
+SUMMARY_REVISION = 1
+SUMMARY_VERSION = hashlib.blake2b(json.dumps(
+    [SUMMARY_REVISION, TECH_CATEGORIES, IMPLEMENTATION_KEYWORDS, PROBLEM_KEYWORDS,
+     RESULT_KEYWORDS, ARGUMENT_KEYWORDS, TERM_REPLACEMENTS],
+    ensure_ascii=False, sort_keys=True
+).encode('utf-8'), digest_size=8).hexdigest()
+
+# 运行指标
+class MetricsRegistry:
+    """进程内的计数器和直方图，按 Prometheus 文本格式输出
+    
+    指标在模块加载时注册，之后通过名称和标签记录数据。
+    gauge 在每次输出时调用回调函数取值。
+    """
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+    FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+    
+    def _register(self, name, kind, help_text, labels, **extra):
+        self._metrics[name] = dict(kind=kind, help=help_text, labels=tuple(labels), series={}, **extra)
+    
+    def counter(self, name, help_text, labels=()):
+        self._register(name, 'counter', help_text, labels)
+    
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self._register(name, 'histogram', help_text, labels, buckets=tuple(buckets))
+    
+    def gauge(self, name, help_text, labels, callback):
+        """callback 返回 {标签值元组: 数值}"""
+        self._register(name, 'gauge', help_text, labels, callback=callback)
+    
+    def _key(self, metric, labels):
+        return tuple(str(labels.get(label, '')) for label in metric['labels'])
+    
+    def inc(self, name, amount=1, **labels):
+        metric = self._metrics[name]
+        key = self._key(metric, labels)
+        with self._lock:
+            metric['series'][key] = metric['series'].get(key, 0) + amount
+    
+    def observe(self, name, value, **labels):
+        metric = self._metrics[name]
+        key = self._key(metric, labels) if metric['labels'] else ()
+        with self._lock:
+            series = metric['series'].get(key)
+            if series is None:
+                series = metric['series'][key] = {'buckets': [0] * len(metric['buckets']), 'sum': 0.0, 'count': 0}
+            # 只记在值所在的那个桶里，输出时再累加成 Prometheus 要求的累计计数
+            index = bisect_left(metric['buckets'], value)
+            if index < len(series['buckets']):
+                series['buckets'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+    
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+    
+    @staticmethod
+    def _format_labels(names, values, extra=None):
+        pairs = list(zip(names, values)) + list(extra or [])
+        if not pairs:
+            return ''
+        escaped = []
+        for name, value in pairs:
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            escaped.append(f'{name}="{value}"')
+        return '{' + ','.join(escaped) + '}'
+    
+    def render(self):
+        lines = []
+        for name, metric in self._metrics.items():
+            if metric['kind'] == 'gauge':
+                try:
+                    series = metric['callback']()
+                except Exception as e:
+                    logger.warning(f"读取指标 {name} 时出错: {str(e)}")
+                    continue
+            else:
+                # 复制一份，输出时不长时间持有锁
+                with self._lock:
+                    series = {
+                        key: dict(value, buckets=list(value['buckets'])) if isinstance(value, dict) else value
+                        for key, value in metric['series'].items()
+                    }
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['kind']}")
+            for key, value in sorted(series.items()):
+                if metric['kind'] != 'histogram':
+                    lines.append(f"{name}{self._format_labels(metric['labels'], key)} {value}")
+                    continue
+                for bound, count in zip(metric['buckets'], accumulate(value['buckets'])):
+                    lines.append(f"{name}_bucket{self._format_labels(metric['labels'], key, [('le', bound)])} {count}")
+                lines.append(f"{name}_bucket{self._format_labels(metric['labels'], key, [('le', '+Inf')])} {value['count']}")
+                lines.append(f"{name}_sum{self._format_labels(metric['labels'], key)} {value['sum']}")
+                lines.append(f"{name}_count{self._format_labels(metric['labels'], key)} {value['count']}")
+        return '\n'.join(lines) + '\n'
+
+METRICS = MetricsRegistry()
+METRICS.counter('rss_fetch_total', 'RSS源抓取次数，按结果分类', ('source', 'status'))
+METRICS.histogram('rss_fetch_seconds', 'RSS源下载和解析的总耗时', ('source',))
+METRICS.histogram('rss_parse_seconds', 'RSS源解析耗时', ('source',), buckets=MetricsRegistry.FAST_BUCKETS)
+METRICS.counter('rss_fetch_bytes_total', '下载的RSS源字节数', ('source',))
+METRICS.counter('rss_entries_seen_total', 'RSS源中出现的文章数', ('source',))
+METRICS.counter('rss_entries_new_total', '新入库的文章数', ('source',))
+METRICS.histogram('rss_dedup_query_seconds', '检查已有链接的查询耗时', buckets=MetricsRegistry.FAST_BUCKETS)
+METRICS.counter('rss_entries_duplicate_total', '作为近似重复合并到已有文章的文章数', ('source',))
+METRICS.histogram('rss_near_duplicate_lookup_seconds', '单篇文章查找近似重复的耗时', buckets=MetricsRegistry.FAST_BUCKETS)
+METRICS.histogram('rss_commit_seconds', '单个RSS源入库提交的耗时', buckets=MetricsRegistry.FAST_BUCKETS)
+METRICS.histogram('rss_summary_seconds', '单篇文章生成摘要的耗时', buckets=MetricsRegistry.FAST_BUCKETS)
+METRICS.counter('http_requests_total', 'HTTP请求数', ('endpoint', 'method', 'status'))
+METRICS.histogram('http_request_duration_seconds', 'HTTP请求处理耗时', ('endpoint', 'method'))
+
+# 共享的HTTP客户端
+class ResponseTooLarge(Exception):
+    pass
+
+class HttpClient:
+    """RSS源和文章页面共用的HTTP客户端
+    
+    所有请求共享同一个 requests.Session，按主机复用keep-alive连接；
+    连接和读取分别设置超时，响应体以流的方式读取，超过大小或总时长上限时立即中止，
+    不修改进程全局的 socket 超时。
+    """
+    _session = None
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def session():
+        if HttpClient._session is None:
+            with HttpClient._lock:
+                if HttpClient._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=app.config['HTTP_POOL_HOSTS'],
+                        pool_maxsize=app.config['HTTP_POOL_SIZE']
+                    )
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    session.headers.update({
+                        'User-Agent': FEED_USER_AGENT,
+                        'Accept-Encoding': 'gzip, deflate'
+                    })
+                    HttpClient._session = session
+        return HttpClient._session
+    
+    @staticmethod
+    def get(url, headers=None, max_bytes=None):
+        """发起GET请求，返回 (response, body)，body 为解压后的完整响应体"""
+        max_bytes = max_bytes or app.config['HTTP_MAX_RESPONSE_BYTES']
+        deadline = time.monotonic() + app.config['HTTP_TOTAL_TIMEOUT']
+        response = HttpClient.session().get(
+            url,
+            headers=headers,
+            stream=True,
+            timeout=(app.config['HTTP_CONNECT_TIMEOUT'], app.config['HTTP_READ_TIMEOUT'])
+        )
+        with response:
+            declared = response.headers.get('Content-Length')
+            if declared and declared.isdigit() and int(declared) > max_bytes:
+                raise ResponseTooLarge(f"响应体过大: {declared} 字节 {url}")
+            
+            chunks = []
+            size = 0
+            for chunk in HttpClient._iter_body(response):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ResponseTooLarge(f"响应体超过 {max_bytes} 字节 {url}")
+                if time.monotonic() > deadline:
+                    raise requests.Timeout(f"下载超过 {app.config['HTTP_TOTAL_TIMEOUT']} 秒 {url}")
+                chunks.append(chunk)
+        return response, b''.join(chunks)
+    
+    @staticmethod
+    def _iter_body(response, chunk_size=64 * 1024):
+        """逐块读取解压后的响应体
+        
+        iter_content 会一直阻塞到凑满 chunk_size，慢速滴灌的服务器可以借此绕过总时长检查；
+        urllib3 2.x 提供 read1，收到多少数据就返回多少。
+        """
+        read1 = getattr(response.raw, 'read1', None)
+        if read1 is None:
+            yield from response.iter_content(chunk_size=chunk_size)
+            return
+        while True:
+            chunk = read1(chunk_size, decode_content=True)
+            if not chunk:
+                return
+            yield chunk
 
 # 内容提取和摘要生成
 class ContentProcessor:
@@ -56,50 +829,51 @@ class ContentProcessor:
     def extract_article_content(url):
         """从文章URL提取正文内容"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # 移除脚本和样式元素
-            for script in soup(["script", "style", "nav", "header", "footer", "aside"]):
-                script.decompose()
-            
-            # 尝试找到主要内容区域
-            content_selectors = [
-                'article', '.article', '#article',
-                '.content', '#content', '.post-content',
-                '.entry-content', '.post-body', '.article-body',
-                'main', '.main', '#main'
-            ]
-            
-            content = None
-            for selector in content_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    content = elements[0]
-                    break
-            
-            if not content:
-                # 如果没找到特定的内容区域，使用body
-                content = soup.find('body')
-            
-            if content:
-                # 提取文本并清理
-                text = content.get_text()
-                # 清理多余的空白字符
-                text = re.sub(r'\s+', ' ', text).strip()
-                return text[:5000]  # 限制长度
-            
-            return ""
-            
+            return ContentProcessor.fetch_article_text(url)
         except Exception as e:
             logger.warning(f"无法提取文章内容 {url}: {str(e)}")
             return ""
     
+    @staticmethod
+    def fetch_article_text(url):
+        """下载文章页面并提取正文，出错时抛出异常，供需要重试的调用方使用"""
+        response, body = HttpClient.get(url)
+        response.raise_for_status()
+        
+        soup = BeautifulSoup(body, 'html.parser')
+        
+        # 移除脚本和样式元素
+        for script in soup(["script", "style", "nav", "header", "footer", "aside"]):
+            script.decompose()
+        
+        # 尝试找到主要内容区域
+        content_selectors = [
+            'article', '.article', '#article',
+            '.content', '#content', '.post-content',
+            '.entry-content', '.post-body', '.article-body',
+            'main', '.main', '#main'
+        ]
+        
+        content = None
+        for selector in content_selectors:
+            elements = soup.select(selector)
+            if elements:
+                content = elements[0]
+                break
+        
+        if not content:
+            # 如果没找到特定的内容区域，使用body
+            content = soup.find('body')
+        
+        if content:
+            # 提取文本并清理
+            text = content.get_text()
+            # 清理多余的空白字符
+            text = re.sub(r'\s+', ' ', text).strip()
+            return text[:5000]  # 限制长度
+        
+        return ""
+    
     @staticmethod
     def generate_summary(title, description, content):
         """生成结构化的技术摘要"""
@@ -116,8 +890,10 @@ class ContentProcessor:
             if not full_text.strip():
                 return "暂无内容摘要"
             
-            # 生成结构化摘要
+            # 生成结构化摘要；每篇文章都要计时，直接记录耗时，不用 METRICS.timer 的生成器
+            started = time.perf_counter()
             summary = ContentProcessor._generate_structured_summary(full_text, title)
+            METRICS.observe('rss_summary_seconds', time.perf_counter() - started)
             return summary
             
         except Exception as e:
@@ -128,54 +904,23 @@ class ContentProcessor:
     def _generate_structured_summary(text, title=""):
         """生成结构化的技术摘要，包含关键技术点和论点"""
         
-        # 技术领域分类和关键词
-        tech_categories = {
-            '游戏引擎': ['unreal', 'unity', 'godot', 'engine', 'framework', 'runtime'],
-            '渲染技术': ['render', 'shader', 'graphics', 'gpu', 'vulkan', 'directx', 'opengl', 'lighting', 'shadow', 'material'],
-            '物理仿真': ['physics', 'collision', 'rigidbody', 'simulation', 'dynamics', 'constraint'],
-            '动画系统': ['animation', 'skeletal', 'blend', 'timeline', 'motion', 'ik', 'bone'],
-            '人工智能': ['ai', 'ml', 'neural', 'behavior', 'pathfinding', 'decision', 'learning'],
-            '性能优化': ['optimization', 'performance', 'profiling', 'memory', 'cpu', 'fps', 'bottleneck'],
-            '架构设计': ['architecture', 'pattern', 'design', 'component', 'system', 'modular', 'ecs'],
-            '网络编程': ['network', 'multiplayer', 'server', 'client', 'synchronization', 'latency'],
-            '虚拟现实': ['vr', 'ar', 'xr', 'virtual', 'augmented', 'headset', 'tracking'],
-            '工具开发': ['tool', 'editor', 'pipeline', 'automation', 'workflow', 'asset']
-        }
-        
-        # 技术方法和实现关键词
-        implementation_keywords = [
-            'implement', 'algorithm', 'approach', 'method', 'technique', 'solution',
-            '实现', '算法', '方法', '技术', '解决方案', '策略'
-        ]
-        
-        # 问题和挑战关键词
-        problem_keywords = [
-            'problem', 'issue', 'challenge', 'limitation', 'bottleneck', 'bug',
-            '问题', '挑战', '限制', '瓶颈', '困难', '缺陷'
-        ]
-        
-        # 结果和效果关键词
-        result_keywords = [
-            'result', 'performance', 'improvement', 'benefit', 'advantage', 'effect',
-            '结果', '性能', '改进', '优势', '效果', '提升'
-        ]
-        
         # 按句子分割文本
-        sentences = re.split(r'[.!?。！？]\s*', text)
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 15]
+        sentences = SENTENCE_SPLIT_PATTERN.split(text)
+        sentences = [s for s in map(str.strip, sentences) if len(s) > 15]
         
         # 分析每个句子
-        analyzed_sentences = []
-        for sentence in sentences[:20]:  # 分析前20个句子
-            analysis = ContentProcessor._analyze_sentence(sentence, tech_categories, 
-                                                        implementation_keywords, 
-                                                        problem_keywords, 
-                                                        result_keywords)
-            if analysis['relevance_score'] > 0:
-                analyzed_sentences.append(analysis)
+        analyzed_sentences = [
+            analysis for analysis in map(KEYWORD_MATCHER.analyze, sentences[:20])  # 分析前20个句子
+            if analysis.relevance_score > 0
+        ]
         
         # 按相关性排序
-        analyzed_sentences.sort(key=lambda x: x['relevance_score'], reverse=True)
+        analyzed_sentences.sort(key=attrgetter('relevance_score'), reverse=True)
+        
+        # 按句子类型分组，组内保持相关性顺序
+        by_type = {'implementation': [], 'problem': [], 'result': [], 'argument': [], 'general': []}
+        for sentence in analyzed_sentences:
+            by_type[sentence.type].append(sentence)
         
         # 构建结构化摘要
         summary_parts = []
@@ -186,362 +931,2566 @@ class ContentProcessor:
             summary_parts.append(f"📋 **技术领域**: {', '.join(tech_areas)}")
         
         # 2. 关键技术点
-        key_points = ContentProcessor._extract_key_points_structured(analyzed_sentences, 'implementation')
+        key_points = ContentProcessor._extract_key_points_structured(by_type['implementation'], 3)
         if key_points:
             summary_parts.append("🔧 **关键技术点**:")
-            for i, point in enumerate(key_points[:3], 1):
+            for i, point in enumerate(key_points, 1):
                 summary_parts.append(f"   {i}. {point}")
         
         # 3. 主要论点/观点
-        main_arguments = ContentProcessor._extract_key_points_structured(analyzed_sentences, 'argument')
+        main_arguments = ContentProcessor._extract_key_points_structured(by_type['argument'], 3)
         if main_arguments:
             summary_parts.append("💡 **主要论点**:")
-            for i, arg in enumerate(main_arguments[:3], 1):
+            for i, arg in enumerate(main_arguments, 1):
                 summary_parts.append(f"   {i}. {arg}")
         
         # 4. 问题与解决方案
-        problems_solutions = ContentProcessor._extract_problems_solutions(analyzed_sentences)
+        problems_solutions = ContentProcessor._extract_problems_solutions(by_type['problem'], by_type['implementation'])
         if problems_solutions:
             summary_parts.append("⚡ **问题与解决方案**:")
-            for i, ps in enumerate(problems_solutions[:2], 1):
+            for i, ps in enumerate(problems_solutions, 1):
                 summary_parts.append(f"   {i}. {ps}")
         
         # 5. 性能/效果
-        results = ContentProcessor._extract_key_points_structured(analyzed_sentences, 'result')
+        results = ContentProcessor._extract_key_points_structured(by_type['result'], 2)
         if results:
             summary_parts.append("📈 **效果与收益**:")
-            for i, result in enumerate(results[:2], 1):
+            for i, result in enumerate(results, 1):
                 summary_parts.append(f"   {i}. {result}")
         
-        # 如果没有提取到足够信息，生成基础摘要
-        if len(summary_parts) < 2:
-            summary_parts = [f"这是一篇关于{tech_areas[0] if tech_areas else '游戏开发'}的技术文章"]
-            if analyzed_sentences:
-                best_sentence = ContentProcessor._simplify_to_chinese(analyzed_sentences[0]['text'])
-                if best_sentence:
-                    summary_parts.append(best_sentence)
+        # 如果没有提取到足够信息，生成基础摘要
+        if len(summary_parts) < 2:
+            summary_parts = [f"这是一篇关于{tech_areas[0] if tech_areas else '游戏开发'}的技术文章"]
+            if analyzed_sentences:
+                best_sentence = ContentProcessor._simplify_to_chinese(analyzed_sentences[0].text)
+                if best_sentence:
+                    summary_parts.append(best_sentence)
+        
+        # 组合摘要
+        summary = '\n'.join(summary_parts)
+        
+        # 限制总长度
+        if len(summary) > 500:
+            lines = summary.split('\n')
+            summary = '\n'.join(lines[:8]) + '\n...'
+        
+        return summary
+    
+    @staticmethod
+    def _extract_tech_areas(analyzed_sentences):
+        """提取主要技术领域"""
+        area_count = {}
+        for sentence in analyzed_sentences:
+            for area in sentence.tech_areas:
+                area_count[area] = area_count.get(area, 0) + 1
+        
+        # 返回出现频率最高的技术领域，次数相同时保持首次出现的顺序
+        return sorted(area_count, key=area_count.get, reverse=True)[:3]
+    
+    @staticmethod
+    def _extract_key_points_structured(sentences, limit):
+        """从同一类型的句子中提取最多 limit 个关键点，凑够后不再简化后面的句子"""
+        points = []
+        for sentence in sentences:
+            if sentence.relevance_score >= 3:
+                simplified = ContentProcessor._simplify_to_chinese(sentence.text)
+                if simplified and len(simplified) > 10:
+                    points.append(simplified)
+                    if len(points) == limit:
+                        break
+        
+        return points
+    
+    @staticmethod
+    def _extract_problems_solutions(problems, solutions):
+        """提取问题与解决方案对，参数是问题类句子和实现类句子"""
+        # 组合问题和解决方案，凑够两对后不再简化后面的句子
+        combined = []
+        for problem, solution in zip(problems, solutions):
+            problem = ContentProcessor._simplify_to_chinese(problem.text)
+            solution = ContentProcessor._simplify_to_chinese(solution.text)
+            if problem and solution:
+                combined.append(f"问题: {problem[:50]}... → 解决: {solution[:50]}...")
+                if len(combined) == 2:
+                    break
+        
+        return combined
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _simplify_to_chinese(text):
+        """将英文技术句子简化并中文化"""
+        if not text:
+            return ""
+        
+        # 应用替换：在大小写折叠后的副本上匹配，再按位置替换原文
+        if not text.isascii() and TERM_CASE_FOLD_PATTERN.search(text):
+            folded = text.translate(TERM_CASE_FOLD)
+        else:
+            folded = text.lower()
+        parts = []
+        end = 0
+        for match in TERM_PATTERN_LOWER.finditer(folded):
+            parts.append(text[end:match.start()])
+            parts.append(TERM_LOWER[match.group()])
+            end = match.end()
+        if parts:
+            parts.append(text[end:])
+            result = ''.join(parts)
+        else:
+            result = text
+        
+        # 移除过长的技术细节
+        if len(result) > 100:
+            # 尝试提取主要信息
+            sentences = SHORTEN_SPLIT_PATTERN.split(result)
+            if sentences:
+                result = sentences[0] + "。"
+        
+        return result.strip()
+    
+    @staticmethod
+    def summarize_many(items):
+        """批量生成摘要，items 为 (title, description, content) 序列，相同的输入只计算一次
+        
+        配置了 SUMMARY_PROCESSES 时分块交给进程池并行生成，当前线程只等待结果。
+        """
+        items = [tuple(item) for item in items]
+        unique = list(dict.fromkeys(items))
+        summaries = dict(zip(unique, SummaryPool.map(summarize_chunk, unique)))
+        return [summaries[item] for item in items]
+    
+    @staticmethod
+    def html_to_text(html):
+        """把RSS描述中的HTML转为纯文本，只保留前500个字符"""
+        if not html:
+            return ""
+        return BeautifulSoup(html, 'html.parser').get_text()[:500]
+
+# 摘要进程池
+class SummaryPool:
+    """把清理描述和生成摘要交给子进程
+    
+    摘要生成是纯Python的正则和字符串处理，在线程中执行时一直占用GIL，会拖慢同一进程中的抓取、
+    写线程和网页请求。SUMMARY_PROCESSES 大于0时这些工作在进程池中完成，调用方拿到 Future 后等待结果。
+    子进程用 spawn 方式启动，重新导入本模块后只执行模块级的纯函数，不访问数据库，
+    需要的配置由调用方作为参数传入。进程池未配置、无法启动或子进程异常退出时，改为在当前进程中执行。
+    """
+    _executor = None
+    _broken = False
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def enabled():
+        return bool(app.config['SUMMARY_PROCESSES']) and not SummaryPool._broken
+    
+    @staticmethod
+    def _get():
+        if not SummaryPool.enabled():
+            return None
+        with SummaryPool._lock:
+            if SummaryPool._executor is None:
+                processes = app.config['SUMMARY_PROCESSES']
+                SummaryPool._executor = ProcessPoolExecutor(
+                    max_workers=processes, mp_context=multiprocessing.get_context('spawn')
+                )
+                logger.info(f"启动摘要进程池，共 {processes} 个进程")
+            return SummaryPool._executor
+    
+    @staticmethod
+    def _disable(error):
+        """进程池出错后不再使用，之后的任务都在当前进程中执行"""
+        with SummaryPool._lock:
+            if SummaryPool._broken:
+                return
+            SummaryPool._broken = True
+            executor, SummaryPool._executor = SummaryPool._executor, None
+        logger.warning(f"摘要进程池不可用，改为在当前进程中执行: {error}")
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    @staticmethod
+    def _run(future, func, args):
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+    
+    @staticmethod
+    def submit(func, *args):
+        """执行 func(*args) 并返回 Future；func 必须是模块级函数，参数和返回值可以序列化"""
+        outer = Future()
+        try:
+            executor = SummaryPool._get()
+            inner = executor.submit(func, *args) if executor is not None else None
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            SummaryPool._disable(e)
+            inner = None
+        if inner is None:
+            SummaryPool._run(outer, func, args)
+            return outer
+        
+        def relay(done):
+            try:
+                outer.set_result(done.result())
+            except BrokenProcessPool as e:
+                # 子进程异常退出，这个任务改为在当前进程中重新执行
+                SummaryPool._disable(e)
+                SummaryPool._run(outer, func, args)
+            except Exception as e:
+                outer.set_exception(e)
+        
+        inner.add_done_callback(relay)
+        return outer
+    
+    @staticmethod
+    def map(func, items, chunk_size=None):
+        """把 items 按 SUMMARY_CHUNK_SIZE 分块，每块调用一次 func(chunk)，按原顺序合并结果"""
+        chunk_size = chunk_size or app.config['SUMMARY_CHUNK_SIZE']
+        futures = [SummaryPool.submit(func, items[start:start + chunk_size]) for start in range(0, len(items), chunk_size)]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+    
+    @staticmethod
+    def shutdown():
+        """关闭进程池，下次使用时按当前配置重新启动"""
+        with SummaryPool._lock:
+            executor, SummaryPool._executor = SummaryPool._executor, None
+            SummaryPool._broken = False
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+atexit.register(SummaryPool.shutdown)
+
+def summarize_chunk(items):
+    """进程池任务：为一组 (title, description, content) 生成摘要"""
+    return [ContentProcessor.generate_summary(*item) for item in items]
+
+def prepare_entries(items, min_features):
+    """进程池任务：清理RSS条目的描述、计算 SimHash 并生成摘要
+    
+    items 为 (链接, 标题, 原始描述) 序列，返回 {链接: (描述, SimHash, 摘要)}；
+    min_features 为 None 时不计算 SimHash。
+    """
+    prepared = {}
+    for link, title, description in items:
+        description = ContentProcessor.html_to_text(description)
+        simhash = None if min_features is None else NearDuplicates.simhash(title, description, min_features)
+        prepared[link] = (description, simhash, ContentProcessor.generate_summary(title, description, ""))
+    return prepared
+
+# 摘要缓存
+class SummaryCache:
+    """按 (标题, 描述, 正文, 摘要版本) 的哈希缓存生成的摘要
+    
+    缓存保存在 summary_cache 表中，清除文章数据后重新抓取时相同的文章直接复用摘要。
+    文章的 summary_key 记录生成当前摘要时的键，flask resummarize 据此找出输入或摘要版本变化的文章。
+    查询可以在任意线程中进行，写入和淘汰在写线程中完成。淘汰需要统计整张表的条目数，
+    不在每次写入时执行，由调度器每 SUMMARY_CACHE_EVICT_SECONDS 秒执行一次，表中的条目数可能暂时超出上限。
+    """
+    
+    @staticmethod
+    def key(title, description, content):
+        """摘要输入和 SUMMARY_VERSION 的64位哈希，按 SQLite 的有符号整数返回"""
+        data = '\x1f'.join((SUMMARY_VERSION, title or '', description or '', content or ''))
+        return int.from_bytes(hashlib.blake2b(data.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+    
+    @staticmethod
+    def get_many(keys):
+        """返回 {键: 摘要}，只包含缓存中存在的键"""
+        if not app.config['SUMMARY_CACHE_SIZE'] or not keys:
+            return {}
+        rows = db.session.execute(
+            db.select(SummaryCacheEntry.key, SummaryCacheEntry.summary).where(SummaryCacheEntry.key.in_(set(keys)))
+        )
+        return dict(rows.all())
+    
+    @staticmethod
+    def put_many(summaries):
+        """写入 {键: 摘要} 并刷新已有条目的使用时间，在写线程中执行"""
+        limit = app.config['SUMMARY_CACHE_SIZE']
+        if not limit or not summaries:
+            return
+        now = datetime.utcnow()
+        rows = [{'key': key, 'summary': summary, 'last_used_at': now} for key, summary in summaries.items()]
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            statement = sqlite_insert(SummaryCacheEntry).values(rows[start:start + INSERT_BATCH_SIZE])
+            statement = statement.on_conflict_do_update(index_elements=['key'], set_={'last_used_at': now})
+            db.session.execute(statement)
+    
+    @staticmethod
+    def evict():
+        """删除超出 SUMMARY_CACHE_SIZE 的最久未使用的条目，返回删除的条目数"""
+        return IngestWriter.call(SummaryCache._evict)
+    
+    @staticmethod
+    def _evict():
+        limit = app.config['SUMMARY_CACHE_SIZE']
+        if not limit:
+            return 0
+        excess = db.session.query(db.func.count(SummaryCacheEntry.key)).scalar() - limit
+        if excess <= 0:
+            return 0
+        oldest = db.select(SummaryCacheEntry.key).order_by(SummaryCacheEntry.last_used_at).limit(excess)
+        db.session.execute(db.delete(SummaryCacheEntry).where(SummaryCacheEntry.key.in_(oldest)))
+        logger.info(f"摘要缓存淘汰了 {excess} 条最久未使用的条目")
+        return excess
+    
+    @staticmethod
+    def summarize(items):
+        """为 (title, description, content) 序列生成摘要，缓存中没有的交给 summarize_many
+        
+        返回 (摘要列表, 键列表, 命中缓存的数量)。调用方需要在写线程中用 put_many 写回，新摘要才会进入缓存。
+        """
+        items = list(items)
+        keys = [SummaryCache.key(*item) for item in items]
+        summaries = SummaryCache.get_many(keys)
+        missing = [(key, item) for key, item in zip(keys, items) if key not in summaries]
+        METRICS.inc('summary_cache_requests_total', len(items) - len(missing), result='hit')
+        METRICS.inc('summary_cache_requests_total', len(missing), result='miss')
+        hits = len(items) - len(missing)
+        missing = dict(missing)
+        summaries.update(zip(missing, ContentProcessor.summarize_many(missing.values())))
+        return [summaries[key] for key in keys], keys, hits
+    
+    @staticmethod
+    def _save_articles(updates, summaries):
+        """写回重新生成的摘要，在写线程中执行
+        
+        updates 为 (文章ID, 读取时的 summary_key, 新键, 新摘要)；
+        读取之后文章已被全文提取等任务更新（summary_key 变化）的跳过，返回实际更新的文章数。
+        """
+        statement = db.update(Article.__table__).where(
+            Article.__table__.c.id == db.bindparam('b_id'),
+            db.func.coalesce(Article.__table__.c.summary_key, 0) == db.bindparam('b_old_key')
+        ).values(summary=db.bindparam('b_summary'), summary_key=db.bindparam('b_key'))
+        result = db.session.execute(statement, [
+            {'b_id': article_id, 'b_old_key': old_key or 0, 'b_key': key, 'b_summary': summary}
+            for article_id, old_key, key, summary in updates
+        ])
+        SummaryCache.put_many(summaries)
+        PageCache.touch()
+        return result.rowcount
+    
+    @staticmethod
+    def resummarize(batch_size=None, progress=None):
+        """重新生成输入内容或摘要版本发生变化的文章摘要
+        
+        按ID分批扫描文章表，只读取计算键需要的列；每批变化的文章先查缓存，其余由 summarize_many
+        生成（配置了进程池时并行），再通过写线程写回。每批结束后调用 progress(统计)，返回最终统计。
+        """
+        batch_size = batch_size or app.config['RESUMMARIZE_BATCH_SIZE']
+        stats = {
+            'total': db.session.query(db.func.count(Article.id)).scalar(),
+            'checked': 0, 'stale': 0, 'cached': 0, 'updated': 0
+        }
+        last_id = 0
+        while True:
+            rows = db.session.execute(
+                db.select(Article.id, Article.title, Article.description, Article.content, Article.summary_key)
+                .where(Article.id > last_id).order_by(Article.id).limit(batch_size)
+            ).all()
+            # 结束读事务，不妨碍写线程和 WAL 检查点
+            db.session.rollback()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            stats['checked'] += len(rows)
+            
+            stale = [row for row in rows
+                     if SummaryCache.key(row.title, row.description, row.content) != row.summary_key]
+            if stale:
+                items = [(row.title, row.description or '', row.content or '') for row in stale]
+                summaries, keys, cached = SummaryCache.summarize(items)
+                updates = [(row.id, row.summary_key, key, summary) for row, key, summary in zip(stale, keys, summaries)]
+                stats['stale'] += len(stale)
+                stats['cached'] += cached
+                stats['updated'] += IngestWriter.call(SummaryCache._save_articles, updates, dict(zip(keys, summaries)))
+            if progress:
+                progress(dict(stats))
+        return stats
+
+METRICS.counter('summary_cache_requests_total', '摘要缓存的命中和未命中次数', ('result',))
+METRICS.gauge('summary_cache_entries', '摘要缓存表中的条目数', (),
+              lambda: {(): db.session.query(db.func.count(SummaryCacheEntry.key)).scalar()})
+
+# 按主机限制并发
+class HostLimiter:
+    """为每个主机分配一个信号量，限制对同一主机的并发请求数"""
+    def __init__(self, per_host):
+        self.per_host = max(1, per_host)
+        self._lock = threading.Lock()
+        self._semaphores = {}
+    
+    @contextmanager
+    def limit(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host)
+                self._semaphores[host] = semaphore
+        with semaphore:
+            yield
+
+# 按主机限制请求频率
+class HostRateLimiter:
+    """保证对同一主机的两次请求之间至少间隔 interval 秒"""
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_slot = {}
+    
+    def wait(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+# 单一写线程
+class IngestWriter:
+    """抓取和全文提取的所有写操作都交给同一个线程执行
+    
+    写任务是在写线程的数据库会话中执行、不自行提交的函数。写线程每次取出队列中
+    已有的任务（最多 INGEST_BATCH_SIZE 个），在一个事务中执行后统一提交；
+    其中某个任务出错时回滚整批，再逐个执行找出出错的任务。
+    网页请求中的少量写操作（标记已读等）仍在请求线程中完成，依靠 WAL 和 busy_timeout 与写线程共存。
+    """
+    _queue = queue.Queue()
+    _thread = None
+    _lock = threading.Lock()
+    
+    # 写线程的累计统计
+    stats = {'batches': 0, 'tasks': 0, 'retried_batches': 0, 'failed_tasks': 0}
+    
+    @staticmethod
+    def submit(func, *args):
+        """提交写任务，返回 Future，结果为任务函数的返回值"""
+        future = Future()
+        if threading.current_thread() is IngestWriter._thread:
+            # 写任务中再提交写任务时直接执行，避免等待自己
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        IngestWriter._ensure_started()
+        IngestWriter._queue.put((func, args, future))
+        return future
+    
+    @staticmethod
+    def call(func, *args):
+        """提交写任务并等待它提交完成"""
+        return IngestWriter.submit(func, *args).result()
+    
+    @staticmethod
+    def _ensure_started():
+        if IngestWriter._thread is not None and IngestWriter._thread.is_alive():
+            return
+        with IngestWriter._lock:
+            if IngestWriter._thread is None or not IngestWriter._thread.is_alive():
+                thread = threading.Thread(target=IngestWriter._run, name='ingest-writer')
+                thread.daemon = True
+                IngestWriter._thread = thread
+                thread.start()
+    
+    @staticmethod
+    def _run():
+        while True:
+            batch = [IngestWriter._queue.get()]
+            while len(batch) < app.config['INGEST_BATCH_SIZE']:
+                try:
+                    batch.append(IngestWriter._queue.get_nowait())
+                except queue.Empty:
+                    break
+            with app.app_context():
+                IngestWriter._execute(batch)
+    
+    @staticmethod
+    def _execute(batch):
+        IngestWriter.stats['batches'] += 1
+        IngestWriter.stats['tasks'] += len(batch)
+        try:
+            results = [func(*args) for func, args, future in batch]
+            with METRICS.timer('rss_commit_seconds'):
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            if len(batch) == 1:
+                IngestWriter.stats['failed_tasks'] += 1
+                batch[0][2].set_exception(e)
+                return
+            # 逐个重新执行，只让出错的任务失败
+            IngestWriter.stats['retried_batches'] += 1
+            logger.warning(f"写入批次出错，逐个重试 {len(batch)} 个任务: {str(e)}")
+            for item in batch:
+                IngestWriter._execute([item])
+            return
+        for (func, args, future), result in zip(batch, results):
+            future.set_result(result)
+
+# 自适应抓取调度
+class FetchSchedule:
+    """根据发文频率和服务器提示计算每个RSS源的下次抓取时间
+    
+    抓取间隔取 平均发文间隔 / FETCH_POLLS_PER_POST，服务器通过 <ttl> 或
+    Cache-Control: max-age 声明的缓存时间作为下限，最终限制在最短和最长间隔之间。
+    抓取失败时按连续失败次数指数退避。
+    """
+    MAX_AGE_PATTERN = re.compile(r'max-age\s*=\s*(\d+)', re.IGNORECASE)
+    
+    @staticmethod
+    def max_age(headers):
+        """从响应头中读取 Cache-Control: max-age（秒）"""
+        match = FetchSchedule.MAX_AGE_PATTERN.search(headers.get('Cache-Control', ''))
+        return int(match.group(1)) if match else None
+    
+    @staticmethod
+    def _clamp(seconds):
+        return int(min(max(seconds, app.config['FETCH_MIN_INTERVAL']), app.config['FETCH_MAX_INTERVAL']))
+    
+    @staticmethod
+    def posting_interval(feed, now=None):
+        """根据RSS中文章的发布时间估计平均发文间隔（秒），无法估计时返回 None
+        
+        从最早一篇文章到现在的时间除以文章数，长期不更新的源会得到较长的间隔。
+        """
+        now = now or time.time()
+        timestamps = []
+        for entry in feed.entries:
+            parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+            if parsed:
+                timestamps.append(calendar.timegm(parsed))
+        if len(timestamps) < 2:
+            return None
+        return max(now - min(timestamps), 0) / len(timestamps)
+    
+    @staticmethod
+    def server_hint(fetched):
+        """服务器声明的最短刷新间隔（秒）"""
+        hints = []
+        if fetched.get('max_age'):
+            hints.append(fetched['max_age'])
+        feed = fetched.get('feed')
+        if feed is not None:
+            ttl = feed.feed.get('ttl')
+            if ttl and str(ttl).strip().isdigit():
+                hints.append(int(ttl) * 60)
+        return max(hints) if hints else 0
+    
+    @staticmethod
+    def after_fetch(source, fetched):
+        """抓取成功后更新抓取间隔和下次抓取时间，由调用方提交事务"""
+        interval = source.fetch_interval or app.config['FETCH_DEFAULT_INTERVAL']
+        if fetched.get('feed') is not None:
+            # 只有完整解析了RSS才重新估计发文频率，304/内容未变化时沿用上次的估计
+            posting = FetchSchedule.posting_interval(fetched['feed'])
+            interval = posting / app.config['FETCH_POLLS_PER_POST'] if posting else app.config['FETCH_DEFAULT_INTERVAL']
+        interval = FetchSchedule._clamp(max(interval, FetchSchedule.server_hint(fetched)))
+        
+        source.fetch_interval = interval
+        source.fetch_failures = 0
+        source.next_fetch_at = datetime.utcnow() + timedelta(seconds=interval)
+    
+    @staticmethod
+    def after_failure(source):
+        """抓取失败后按连续失败次数退避，由调用方提交事务"""
+        source.fetch_failures = (source.fetch_failures or 0) + 1
+        interval = source.fetch_interval or app.config['FETCH_DEFAULT_INTERVAL']
+        delay = FetchSchedule._clamp(interval * 2 ** min(source.fetch_failures, 10))
+        source.next_fetch_at = datetime.utcnow() + timedelta(seconds=delay)
+        return delay
+    
+    @staticmethod
+    def due_sources(now=None):
+        """到期需要抓取的活跃RSS源"""
+        now = now or datetime.utcnow()
+        return RSSSource.query.filter(
+            RSSSource.active == True,
+            db.or_(RSSSource.next_fetch_at.is_(None), RSSSource.next_fetch_at <= now)
+        ).order_by(RSSSource.next_fetch_at).all()
+
+# 链接规范化
+class UrlKey:
+    """文章链接的规范化和去重键
+    
+    入库时去掉跟踪参数（utm_* 等）和锚点后保存链接；去重使用规范化链接的64位哈希：
+    忽略 http/https、主机名大小写、默认端口、路径末尾的斜杠和查询参数的顺序。
+    哈希列上的唯一索引比完整链接字符串的索引小得多。
+    """
+    # 只去掉已知的跟踪参数；ref 之类的通用名称在很多网站上有实际含义（如git分支、标签），不能去掉
+    TRACKING_PREFIXES = ('utm_',)
+    TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+                       '_hsenc', '_hsmi', 'mkt_tok', 'ref_src'}
+    
+    @staticmethod
+    def _query(query):
+        return [(name, value) for name, value in parse_qsl(query, keep_blank_values=True)
+                if name.lower() not in UrlKey.TRACKING_PARAMS and not name.lower().startswith(UrlKey.TRACKING_PREFIXES)]
+    
+    @staticmethod
+    def clean(url):
+        """去掉跟踪参数和锚点，其余部分保持原样，用于保存和展示"""
+        url = url.strip()
+        parts = urlsplit(url)
+        if not parts.query and not parts.fragment:
+            return url
+        query = parts.query
+        kept = UrlKey._query(query)
+        if len(kept) != len(parse_qsl(query, keep_blank_values=True)):
+            query = urlencode(kept)
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))
+    
+    @staticmethod
+    def canonical(url):
+        """只用于比较的规范形式，不含协议"""
+        parts = urlsplit(url.strip())
+        host = (parts.hostname or '').rstrip('.')
+        try:
+            port = parts.port
+        except ValueError:
+            port = None
+        if port and port not in (80, 443):
+            host = f"{host}:{port}"
+        path = parts.path or '/'
+        if len(path) > 1:
+            path = path.rstrip('/') or '/'
+        query = urlencode(sorted(UrlKey._query(parts.query)))
+        return f"//{host}{path}" + (f"?{query}" if query else '')
+    
+    @staticmethod
+    def hash(url):
+        """规范化链接的64位哈希，按 SQLite 的有符号整数返回"""
+        digest = hashlib.blake2b(UrlKey.canonical(url).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big', signed=True)
+    
+    @staticmethod
+    def backfill(batch_size=1000):
+        """为升级前的数据补充 url_hash，并合并规范化后相同的文章，返回合并的文章数
+        
+        只有补充了哈希或者唯一索引还没有建立时才检查重复，平时启动不需要扫描全表。
+        """
+        backfilled = 0
+        for model in (Article, ArchivedArticle, ArticleAlternate):
+            while True:
+                rows = db.session.query(model.id, model.url).filter(model.url_hash.is_(None)).limit(batch_size).all()
+                if not rows:
+                    break
+                db.session.execute(db.update(model), [{'id': row_id, 'url_hash': UrlKey.hash(url)} for row_id, url in rows])
+                db.session.commit()
+                backfilled += len(rows)
+        
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('article')}
+        if not backfilled and 'ix_article_url_hash' in indexes:
+            return 0
+        
+        merged = 0
+        duplicated = db.session.query(Article.url_hash).group_by(Article.url_hash).having(db.func.count(Article.id) > 1)
+        for (url_hash,) in duplicated.all():
+            rows = db.session.query(Article.id, Article.read_status).filter(Article.url_hash == url_hash).order_by(Article.id).all()
+            keep = rows[0][0]
+            drop = [row_id for row_id, _ in rows[1:]]
+            # 保留最早入库的一篇，任何一篇已读则保留的文章也标记为已读
+            if any(read for _, read in rows):
+                Article.query.filter_by(id=keep).update({'read_status': True})
+            ArticleAlternate.query.filter(ArticleAlternate.article_id.in_(drop)).update(
+                {'article_id': keep}, synchronize_session=False)
+            ExtractionJob.query.filter(ExtractionJob.article_id.in_(drop)).delete(synchronize_session=False)
+            ArticleFingerprint.query.filter(ArticleFingerprint.article_id.in_(drop)).delete(synchronize_session=False)
+            Article.query.filter(Article.id.in_(drop)).delete(synchronize_session=False)
+            merged += len(drop)
+        
+        # 归档表和重复文章表中只保留每个链接的第一条
+        for model in (ArchivedArticle, ArticleAlternate):
+            keep = db.session.query(db.func.min(model.id)).group_by(model.url_hash)
+            model.query.filter(model.id.notin_(keep.scalar_subquery())).delete(synchronize_session=False)
+        db.session.commit()
+        
+        if merged:
+            CategoryStat.rebuild()
+            logger.info(f"合并了 {merged} 篇链接规范化后相同的文章")
+        return merged
+
+# 近似重复检测
+class NearDuplicates:
+    """基于 SimHash 的近似重复检测
+    
+    同一篇文章经常通过多个RSS源（官方博客、聚合源）以不同的链接出现。入库时对标题和描述
+    计算64位 SimHash，与其他RSS源已有文章的指纹比较，汉明距离不超过 NEAR_DUPLICATE_DISTANCE 时
+    不再保存和生成摘要，只把链接记录为已有文章的其他来源。
+    
+    指纹拆成4段16位，距离不超过3的两个指纹至少有一段完全相同，所以只需要按4个索引
+    查出候选再逐个计算距离，查询代价与文章总数基本无关。
+    """
+    TOKEN_PATTERN = re.compile(r'[a-z0-9]+|[\u4e00-\u9fff]+')
+    MASK = (1 << 64) - 1
+    # 每段各用一个覆盖索引，候选再按主键回表排除同一RSS源的文章；
+    # 这条查询在入库时每篇文章执行一次，用 text() 省去语句构建的开销
+    CANDIDATES_QUERY = text(' UNION ALL '.join(
+        f"SELECT f.article_id, f.simhash FROM article_fingerprint f JOIN article a ON a.id = f.article_id "
+        f"WHERE f.band{i} = :band{i} AND a.source_id != :source_id" for i in range(4)
+    ))
+    
+    @staticmethod
+    def features(title, description):
+        """英文按单词、中文按相邻两个字切分，特征为单个词和相邻两个词，返回特征及出现次数
+        
+        只用单个词时，模板化的技术文章之间容易误判为重复，加入相邻词组后区分度更高。
+        """
+        tokens = []
+        for token in NearDuplicates.TOKEN_PATTERN.findall(f"{title} {description}".lower()):
+            if '\u4e00' <= token[0] <= '\u9fff' and len(token) > 1:
+                tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+            else:
+                tokens.append(token)
+        features = Counter(tokens)
+        features.update(' '.join(tokens[i:i + 2]) for i in range(len(tokens) - 1))
+        return features
+    
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _feature_bits(feature):
+        """特征哈希的64位展开为 +1/-1，常见的词只计算一次"""
+        value = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        return tuple(1 if value >> bit & 1 else -1 for bit in range(64))
+    
+    @staticmethod
+    def simhash(title, description, min_features=None):
+        """返回无符号64位 SimHash，特征太少无法可靠比较时返回 None"""
+        if min_features is None:
+            min_features = app.config['NEAR_DUPLICATE_MIN_FEATURES']
+        features = NearDuplicates.features(title or '', description or '')
+        if len(features) < min_features:
+            return None
+        rows = []
+        for feature, weight in features.items():
+            bits = NearDuplicates._feature_bits(feature)
+            rows.append(bits if weight == 1 else tuple(weight * bit for bit in bits))
+        # 按位求和，zip 在C层面转置，比逐位累加快得多
+        return sum(1 << bit for bit, column in enumerate(zip(*rows)) if sum(column) > 0)
+    
+    @staticmethod
+    def _row(article_id, simhash):
+        signed = simhash - (1 << 64) if simhash >= 1 << 63 else simhash
+        bands = [(simhash >> (16 * i)) & 0xFFFF for i in range(4)]
+        return {'article_id': article_id, 'simhash': signed,
+                'band0': bands[0], 'band1': bands[1], 'band2': bands[2], 'band3': bands[3]}
+    
+    @staticmethod
+    def find(simhash, source_id):
+        """查找其他RSS源中最接近的已有文章，返回 (文章ID, 汉明距离)，没有近似重复时返回 None
+        
+        同一RSS源内的相似文章（如系列文章、周报）是不同的文章，不合并。
+        """
+        row = NearDuplicates._row(None, simhash)
+        row['source_id'] = source_id
+        candidates = db.session.execute(NearDuplicates.CANDIDATES_QUERY, row)
+        best = None
+        for article_id, other in candidates:
+            distance = ((other & NearDuplicates.MASK) ^ simhash).bit_count()
+            if best is None or distance < best[1]:
+                best = (article_id, distance)
+        if best is not None and best[1] <= min(app.config['NEAR_DUPLICATE_DISTANCE'], 3):
+            return best
+        return None
+    
+    @staticmethod
+    def store(fingerprints):
+        """保存 [(文章ID, SimHash)]，由调用方提交事务"""
+        rows = [NearDuplicates._row(article_id, simhash) for article_id, simhash in fingerprints]
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            statement = sqlite_insert(ArticleFingerprint).values(rows[start:start + INSERT_BATCH_SIZE]).on_conflict_do_nothing()
+            db.session.execute(statement)
+    
+    @staticmethod
+    def alternates(article_id):
+        """合并到这篇文章的其他来源"""
+        return ArticleAlternate.query.options(joinedload(ArticleAlternate.source)).filter_by(
+            article_id=article_id
+        ).order_by(ArticleAlternate.id).all()
+    
+    @staticmethod
+    def add_alternates(rows):
+        """记录合并掉的重复文章，由调用方提交事务"""
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            statement = sqlite_insert(ArticleAlternate).values(rows[start:start + INSERT_BATCH_SIZE]).on_conflict_do_nothing()
+            db.session.execute(statement)
+
+# RSS抓取功能
+class RSSFetcher:
+    # 最近一次 fetch_all_sources 的运行统计
+    last_run = {}
+    # 同一时间只允许一轮抓取，定时任务和手动抓取共用
+    run_lock = threading.Lock()
+    
+    @staticmethod
+    def download_feed(url, etag=None, last_modified=None, content_hash=None):
+        """下载并解析RSS源，不访问数据库，可以在工作线程中执行
+        
+        带上次保存的 ETag / Last-Modified 发起条件请求；服务器返回304，
+        或者响应内容的哈希与上次相同时，直接跳过解析。
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        
+        response, body = HttpClient.get(url, headers=headers)
+        fetched = {
+            'status': 'ok',
+            'feed': None,
+            'etag': response.headers.get('ETag') or etag,
+            'last_modified': response.headers.get('Last-Modified') or last_modified,
+            'content_hash': content_hash,
+            'bytes': len(body),
+            'max_age': FetchSchedule.max_age(response.headers),
+            'parse_seconds': 0.0
+        }
+        
+        if response.status_code == 304:
+            fetched['status'] = 'not_modified'
+            return fetched
+        response.raise_for_status()
+        
+        fetched['content_hash'] = hashlib.sha256(body).hexdigest()
+        if content_hash and fetched['content_hash'] == content_hash:
+            fetched['status'] = 'unchanged'
+            return fetched
+        
+        parse_started = time.perf_counter()
+        fetched['feed'] = feedparser.parse(body, response_headers={
+            'content-type': response.headers.get('Content-Type', ''),
+            'content-location': response.url
+        })
+        fetched['parse_seconds'] = time.perf_counter() - parse_started
+        return fetched
+    
+    @staticmethod
+    def download_source(source):
+        """使用RSS源保存的校验信息下载"""
+        return RSSFetcher.download_feed(source.url, source.etag, source.last_modified, source.content_hash)
+    
+    @staticmethod
+    def _save_validators(source, fetched):
+        source.etag = fetched['etag']
+        source.last_modified = fetched['last_modified']
+        source.content_hash = fetched['content_hash']
+    
+    @staticmethod
+    def fetch_articles(source, fetched=None):
+        """抓取单个RSS源并写入数据库；fetched 不为空时表示已经在工作线程中下载解析完成
+        
+        写入交给 IngestWriter 完成，当前线程等待写入结束后返回新文章数。
+        """
+        try:
+            if fetched is None:
+                logger.info(f"正在抓取RSS源: {source.name}")
+                fetched = RSSFetcher.download_source(source)
+            fetched['prepared'] = RSSFetcher._wait_prepared(source, RSSFetcher.prepare_feed(source, fetched))
+            new_articles = IngestWriter.call(RSSFetcher.store_feed, source.id, fetched)
+            # 写线程已经提交，让当前会话重新读取最新数据
+            db.session.expire_all()
+            return new_articles
+            
+        except Exception as e:
+            logger.error(f"抓取RSS源 {source.name} 时出错: {str(e)}")
+            RSSFetcher._record_failure(source)
+            return 0
+    
+    @staticmethod
+    def _raw_description(entry):
+        if hasattr(entry, 'summary'):
+            return entry.summary
+        if hasattr(entry, 'description'):
+            return entry.description
+        return ""
+    
+    @staticmethod
+    def _entry_guid(entry):
+        return entry.get('id') or entry.get('link')
+    
+    @staticmethod
+    def _entry_published(entry):
+        """条目的发布时间，没有时使用更新时间"""
+        for key in ('published_parsed', 'updated_parsed'):
+            value = entry.get(key)
+            if value:
+                try:
+                    return datetime(*value[:6])
+                except (ValueError, TypeError):
+                    pass
+        return None
+    
+    @staticmethod
+    def select_entries(entries, high_water_guid, high_water_published):
+        """按高水位挑出需要处理的条目，返回 (条目列表, 是否到达高水位)
+        
+        RSS源按从新到旧排列时，遇到上次记录的最新条目（GUID相同），或者发布时间早于高水位
+        FEED_HIGH_WATER_GRACE 秒以上的条目就停止，更旧的条目不再做去重查询。
+        条目没有按发布时间倒序排列时无法判断位置，处理全部条目。
+        还没有高水位的新RSS源只处理最新的 FEED_INITIAL_ENTRIES 篇。
+        """
+        if high_water_guid is None and high_water_published is None:
+            return entries[:app.config['FEED_INITIAL_ENTRIES']], False
+        
+        dates = [published for published in map(RSSFetcher._entry_published, entries) if published is not None]
+        if any(newer < older for newer, older in zip(dates, dates[1:])):
+            return entries, False
+        cutoff = None
+        if high_water_published is not None:
+            cutoff = high_water_published - timedelta(seconds=app.config['FEED_HIGH_WATER_GRACE'])
+        for i, entry in enumerate(entries):
+            if high_water_guid is not None and RSSFetcher._entry_guid(entry) == high_water_guid:
+                return entries[:i], True
+            published = RSSFetcher._entry_published(entry) if cutoff is not None else None
+            if published is not None and published < cutoff:
+                return entries[:i], True
+        return entries, False
+    
+    @staticmethod
+    def missed_entries(entries, high_water_guid, high_water_published):
+        """判断两次抓取之间的新文章是否超出了当前文档
+        
+        只有文档中找不到高水位的GUID、并且所有带发布时间的条目都比高水位新时才能确定；
+        条目没有按发布时间倒序排列、或没有记录高水位时间时无法判断，返回 False。
+        """
+        if high_water_published is None:
+            return False
+        if high_water_guid is not None and any(RSSFetcher._entry_guid(entry) == high_water_guid for entry in entries):
+            return False
+        dates = [published for published in map(RSSFetcher._entry_published, entries) if published is not None]
+        if not dates or any(newer < older for newer, older in zip(dates, dates[1:])):
+            return False
+        return dates[-1] > high_water_published
+    
+    @staticmethod
+    def _advance_high_water(source, entries):
+        """把RSS源的高水位移到本次文档中最新的条目，未来的发布时间按当前时间记录"""
+        if not entries:
+            return
+        dated = [(published, entry) for entry in entries
+                 if (published := RSSFetcher._entry_published(entry)) is not None]
+        if not dated:
+            source.high_water_guid = (RSSFetcher._entry_guid(entries[0]) or '')[:500] or None
+            return
+        published, newest = max(dated, key=lambda item: item[0])
+        source.high_water_guid = (RSSFetcher._entry_guid(newest) or '')[:500] or None
+        published = min(published, datetime.utcnow())
+        if source.high_water_published is None or published > source.high_water_published:
+            source.high_water_published = published
+    
+    @staticmethod
+    def prepare_feed(source, fetched):
+        """按高水位挑出RSS源中需要处理的条目，交给 prepare 预处理，返回结果的 Future 或 None"""
+        feed = fetched.get('feed')
+        if not SummaryPool.enabled() or fetched['status'] != 'ok' or not getattr(feed, 'entries', None):
+            return None
+        entries, _ = RSSFetcher.select_entries(feed.entries, source.high_water_guid, source.high_water_published)
+        return RSSFetcher.prepare(entries)
+    
+    @staticmethod
+    def prepare(entries):
+        """把新文章的描述清理、SimHash 和摘要交给 SummaryPool，返回结果的 Future
+        
+        在下载线程之外、写线程之前执行：先用一个独立的短连接查出已经存在的链接，只预处理新文章。
+        Future 的结果为 {原始链接: (描述, SimHash, 摘要)}，由 _store_entries 直接使用，
+        没有预处理结果的条目仍在写线程中处理。进程池未启用或没有新文章时返回 None。
+        """
+        if not SummaryPool.enabled():
+            return None
+        entries = [entry for entry in entries if entry.get('link')]
+        url_hashes = {entry.link: UrlKey.hash(entry.link) for entry in entries}
+        # 不使用当前会话，避免协调线程长时间持有读事务
+        with db.engine.connect() as connection:
+            seen_hashes = RSSFetcher._existing_hashes(set(url_hashes.values()), connection)
+        
+        items = []
+        for entry in entries:
+            if url_hashes[entry.link] in seen_hashes:
+                continue
+            seen_hashes.add(url_hashes[entry.link])
+            items.append((entry.link, entry.get('title', '')[:500], RSSFetcher._raw_description(entry)))
+        if not items:
+            return None
+        min_features = app.config['NEAR_DUPLICATE_MIN_FEATURES'] if app.config['NEAR_DUPLICATE_ENABLED'] else None
+        return SummaryPool.submit(prepare_entries, items, min_features)
+    
+    @staticmethod
+    def _wait_prepared(source, future):
+        """等待预处理结果，出错时返回空字典，留给写线程处理"""
+        if future is None:
+            return {}
+        try:
+            return future.result()
+        except Exception as e:
+            logger.warning(f"预处理RSS源 {source.name} 的文章失败，改为入库时处理: {str(e)}")
+            return {}
+    
+    @staticmethod
+    def store_feed(source_id, fetched):
+        """把下载解析好的RSS源写入数据库，在 IngestWriter 线程中执行，由写线程提交事务"""
+        source = db.session.get(RSSSource, source_id)
+        if source is None:
+            # 抓取期间RSS源被删除
+            return 0
+        
+        if fetched['status'] != 'ok':
+            # 304 或内容哈希相同，跳过解析和去重
+            logger.info(f"RSS源未变化，跳过: {source.name}")
+            source.last_updated = datetime.utcnow()
+            FetchSchedule.after_fetch(source, fetched)
+            return 0
+        
+        feed = fetched['feed']
+        if feed.bozo:
+            logger.warning(f"RSS源可能有问题: {source.name} - {feed.bozo_exception}")
+        
+        if not hasattr(feed, 'entries') or not feed.entries:
+            logger.warning(f"RSS源没有文章: {source.name}")
+            RSSFetcher._save_validators(source, fetched)
+            FetchSchedule.after_fetch(source, fetched)
+            return 0
+        
+        logger.debug("RSS源 %s 找到 %d 篇文章", source.name, len(feed.entries))
+        
+        # 只处理上次高水位之后的条目
+        entries, reached = RSSFetcher.select_entries(feed.entries, source.high_water_guid, source.high_water_published)
+        if reached:
+            logger.debug("RSS源 %s 到达上次处理的位置，处理 %d/%d 篇", source.name, len(entries), len(feed.entries))
+        new_articles, failed = RSSFetcher._store_entries(source, entries, fetched.get('prepared') or {})
+        
+        # 新RSS源没有处理完的条目，以及两次抓取之间新文章超出了当前文档（有分页可以继续读取）时，交给后台回填；
+        # 条目没有按时间排列而处理了全部条目时不回填
+        if source.high_water_guid is None and source.high_water_published is None:
+            backfill = len(entries) < len(feed.entries) or FeedBackfill.next_page(feed)
+        else:
+            backfill = not reached and RSSFetcher.missed_entries(
+                feed.entries, source.high_water_guid, source.high_water_published
+            ) and FeedBackfill.next_page(feed)
+        if backfill:
+            source.backfill_status = 'pending'
+        # 有条目处理出错时高水位保持不变，RSS源更新后这些条目会和新条目一起重新处理
+        if failed:
+            logger.warning(f"RSS源 {source.name} 有 {failed} 篇文章处理出错，高水位保持不变")
+        else:
+            RSSFetcher._advance_high_water(source, feed.entries)
+        
+        # 更新源的最后更新时间，文章入库成功后才保存校验信息
+        source.last_updated = datetime.utcnow()
+        RSSFetcher._save_validators(source, fetched)
+        FetchSchedule.after_fetch(source, fetched)
+        
+        logger.debug("从 %s 抓取了 %d 篇新文章", source.name, new_articles)
+        return new_articles
+    
+    @staticmethod
+    def store_backfill(source_id, entries, prepared):
+        """写入回填的一批条目，在 IngestWriter 线程中执行，不改变高水位和抓取调度"""
+        source = db.session.get(RSSSource, source_id)
+        if source is None:
+            return 0
+        new_articles, _ = RSSFetcher._store_entries(source, entries, prepared)
+        return new_articles
+    
+    @staticmethod
+    def _store_entries(source, entries, prepared):
+        """去重后把条目写入文章表，返回 (新文章数, 处理出错的条目数)；prepared 为 prepare 的结果"""
+        # 用一次查询检查整个RSS源中哪些链接已经存在，按规范化链接的哈希比较
+        url_hashes = {entry.get('link'): UrlKey.hash(entry.get('link')) for entry in entries if entry.get('link')}
+        with METRICS.timer('rss_dedup_query_seconds'):
+            seen_hashes = RSSFetcher._existing_hashes(set(url_hashes.values()))
+        
+        new_rows = []
+        unsummarized = []
+        summary_inputs = []
+        fingerprints = {}  # 链接 -> SimHash
+        alternates = []
+        detect_duplicates = app.config['NEAR_DUPLICATE_ENABLED']
+        failed = 0
+        for i, entry in enumerate(entries):
+            try:
+                logger.debug("正在检查文章: %s (URL: %s)", entry.title, entry.link)
+                
+                # 同一个RSS源中重复出现的链接也只处理一次
+                url_hash = url_hashes[entry.link]
+                if url_hash in seen_hashes:
+                    logger.debug("文章已存在，跳过: %s", entry.title)
+                    continue
+                seen_hashes.add(url_hash)
+                link = UrlKey.clean(entry.link)
+                
+                logger.debug("文章不存在，开始处理: %s", entry.title)
+                
+                # 解析发布日期
+                published_date = RSSFetcher._entry_published(entry)
+                # 限制标题长度；摘要和 summary_key 也用保存的标题，resummarize 时才能得到相同的键
+                title = entry.title[:500]
+                
+                # 进程池已经清理了描述中的HTML并计算好 SimHash 和摘要时直接使用
+                if entry.link in prepared:
+                    description, simhash, summary = prepared[entry.link]
+                else:
+                    description = ContentProcessor.html_to_text(RSSFetcher._raw_description(entry))
+                    simhash = NearDuplicates.simhash(title, description) if detect_duplicates else None
+                    summary = None
+                
+                # 其他RSS源已经收录的近似重复文章只记录链接，不再保存和生成摘要
+                if detect_duplicates and simhash is not None:
+                    with METRICS.timer('rss_near_duplicate_lookup_seconds'):
+                        duplicate = NearDuplicates.find(simhash, source.id)
+                    if duplicate is not None:
+                        logger.debug("近似重复文章，合并到文章 %d: %s", duplicate[0], entry.title)
+                        alternates.append({
+                            'article_id': duplicate[0],
+                            'source_id': source.id,
+                            'title': title,
+                            'url': link,
+                            'url_hash': url_hash,
+                            'distance': duplicate[1],
+                            'created_at': datetime.utcnow()
+                        })
+                        continue
+                    fingerprints[link] = simhash
+                
+                # 提取标签
+                tags = []
+                if hasattr(entry, 'tags'):
+                    tags = [tag.term for tag in entry.tags]
+                
+                # 完整内容由后台提取队列补全，入库时先用描述生成摘要
+                article_content = ""
+                
+                # 创建新文章，没有预先生成的摘要在整个RSS源处理完后批量生成
+                row = {
+                    'title': title,
+                    'url': link,
+                    'url_hash': url_hash,
+                    'description': description,
+                    'content': article_content,
+                    'author': getattr(entry, 'author', '')[:100],  # 限制作者长度
+                    'published_date': published_date,
+                    'source_id': source.id,
+                    'tags': ','.join(tags)[:500],  # 限制标签长度
+                    'summary': summary,
+                    'summary_key': SummaryCache.key(title, description, ""),
+                    'read_status': False,
+                    'created_at': datetime.utcnow()
+                }
+                new_rows.append(row)
+                if summary is None:
+                    unsummarized.append(row)
+                    summary_inputs.append((title, description, ""))
+                
+            except Exception as e:
+                logger.warning(f"处理文章时出错: {str(e)}")
+                failed += 1
+                continue
+        
+        summaries, _, _ = SummaryCache.summarize(summary_inputs)
+        for row, summary in zip(unsummarized, summaries):
+            row['summary'] = summary
+        SummaryCache.put_many({row['summary_key']: row['summary'] for row in new_rows})
+        
+        # 批量插入，其他源已插入相同链接时忽略冲突
+        inserted = RSSFetcher._insert_articles(new_rows)
+        inserted_ids = [article_id for article_id, _ in inserted]
+        new_articles = len(inserted_ids)
+        NearDuplicates.store([(article_id, fingerprints[url]) for article_id, url in inserted if url in fingerprints])
+        if alternates:
+            NearDuplicates.add_alternates(alternates)
+            METRICS.inc('rss_entries_duplicate_total', len(alternates), source=source.name)
+        CategoryStat.apply(source.category, articles=new_articles, unread=new_articles)
+        if new_articles:
+            PageCache.touch()
+        
+        # 新文章进入全文提取队列，由后台任务补全内容和摘要
+        if app.config['EXTRACTION_ENABLED']:
+            ExtractionQueue.enqueue(inserted_ids)
+        return new_articles, failed
+    
+    @staticmethod
+    def _existing_hashes(url_hashes, connection=None):
+        """返回数据库（包括归档表和合并掉的重复文章）中已经存在的链接哈希集合，默认使用当前会话查询"""
+        if not url_hashes:
+            return set()
+        url_hashes = list(url_hashes)
+        statement = db.union_all(
+            db.select(Article.url_hash).where(Article.url_hash.in_(url_hashes)),
+            db.select(ArchivedArticle.url_hash).where(ArchivedArticle.url_hash.in_(url_hashes)),
+            db.select(ArticleAlternate.url_hash).where(ArticleAlternate.url_hash.in_(url_hashes))
+        )
+        rows = (connection or db.session).execute(statement)
+        return {url_hash for (url_hash,) in rows}
+    
+    @staticmethod
+    def _insert_articles(rows):
+        """批量插入文章并返回实际插入的 (文章ID, 链接)，链接哈希冲突的行会被跳过"""
+        inserted = []
+        # 控制每条语句的参数个数，兼容 SQLite 的变量数量上限
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            statement = (
+                sqlite_insert(Article)
+                .values(rows[start:start + INSERT_BATCH_SIZE])
+                .on_conflict_do_nothing()
+                .returning(Article.id, Article.url)
+            )
+            inserted.extend(tuple(row) for row in db.session.execute(statement))
+        return inserted
+    
+    @staticmethod
+    def _record_failure(source):
+        """记录抓取失败，由写线程推迟该源的下次抓取"""
+        METRICS.inc('rss_fetch_total', source=source.name, status='error')
+        try:
+            IngestWriter.call(RSSFetcher._store_failure, source.id)
+        except Exception as e:
+            logger.error(f"更新RSS源 {source.name} 的调度信息时出错: {str(e)}")
+    
+    @staticmethod
+    def _store_failure(source_id):
+        source = db.session.get(RSSSource, source_id)
+        if source is None:
+            return
+        delay = FetchSchedule.after_failure(source)
+        logger.info(f"RSS源 {source.name} 连续失败 {source.fetch_failures} 次，{delay // 60} 分钟后重试")
+    
+    @staticmethod
+    def fetch_due_sources():
+        """只抓取到了下次抓取时间的RSS源，由调度器定时调用"""
+        # 手动抓取正在进行时跳过这一轮，到期的源留给下一轮
+        if not RSSFetcher.run_lock.acquire(blocking=False):
+            logger.info("已有抓取任务在运行，跳过本轮定时抓取")
+            return 0
+        try:
+            sources = FetchSchedule.due_sources()
+            if not sources:
+                logger.debug("没有到期的RSS源")
+                return 0
+            return RSSFetcher.fetch_all_sources(sources)
+        finally:
+            RSSFetcher.run_lock.release()
+    
+    @staticmethod
+    def queue_due_sources():
+        """在后台线程中立即抓取一轮到期的RSS源，调用方不等待
+        
+        新添加的源没有下次抓取时间，会在这一轮被抓取；已有抓取在运行时由下一次定时检查处理。
+        """
+        worker = threading.Thread(target=with_app_context(RSSFetcher.fetch_due_sources), name='fetch-due')
+        worker.daemon = True
+        worker.start()
+    
+    @staticmethod
+    def fetch_all_sources(sources=None, progress=None):
+        """抓取RSS源的文章，未指定时抓取所有活跃的RSS源
+        
+        progress 不为空时，每个源处理完成或出错后都会以事件字典调用一次。
+        """
+        try:
+            if sources is None:
+                logger.info("开始抓取所有RSS源")
+                sources = RSSSource.query.filter_by(active=True).all()
+                logger.info(f"找到 {len(sources)} 个活跃的RSS源")
+            else:
+                logger.info(f"开始抓取 {len(sources)} 个到期的RSS源")
+            
+            if not sources:
+                logger.warning("没有找到活跃的RSS源")
+                return 0
+            
+            started = time.perf_counter()
+            RSSFetcher._notify(progress, {'type': 'start', 'total': len(sources)})
+            workers = app.config.get('RSS_FETCH_WORKERS', 1)
+            if workers > 1:
+                stats = RSSFetcher._fetch_concurrently(sources, workers, progress)
+            else:
+                stats = RSSFetcher._fetch_serially(sources, progress)
+            elapsed = time.perf_counter() - started
+            # 写线程已经提交，让当前会话重新读取最新数据
+            db.session.expire_all()
+            
+            stats['elapsed'] = round(elapsed, 3)
+            stats['finished_at'] = datetime.utcnow().isoformat()
+            RSSFetcher.last_run = stats
+            
+            slowest = sorted(stats['latencies'].items(), key=lambda x: x[1]['total'], reverse=True)[:5]
+            logger.info(f"RSS抓取完成！成功: {stats['successful']}, 失败: {stats['failed']}, "
+                        f"未变化跳过: {stats['unchanged']}, 总新增文章: {stats['new_articles']}, "
+                        f"下载 {stats['bytes'] / 1024:.1f}KB, 总耗时: {elapsed:.2f}s")
+            if slowest:
+                logger.info("最慢的RSS源: " + ", ".join(f"{name} {item['total']:.2f}s" for name, item in slowest))
+            return stats['new_articles']
+            
+        except Exception as e:
+            logger.error(f"抓取所有RSS源时出错: {str(e)}")
+            return 0
+    
+    @staticmethod
+    def _new_run_stats(workers):
+        return {
+            'workers': workers,
+            'successful': 0,
+            'failed': 0,
+            'unchanged': 0,  # 304 或内容未变化而跳过解析的源
+            'bytes': 0,  # 下载的总字节数
+            'new_articles': 0,
+            'latencies': {}  # 源名称 -> {'fetch': 下载解析耗时, 'store': 入库耗时, 'total': 总耗时}
+        }
+    
+    @staticmethod
+    def _notify(progress, event):
+        if progress is None:
+            return
+        try:
+            progress(event)
+        except Exception as e:
+            logger.warning(f"发送抓取进度时出错: {str(e)}")
+    
+    @staticmethod
+    def _record_source(stats, source, fetched, fetch_time, store_started, new_articles):
+        store_time = time.perf_counter() - store_started
+        METRICS.inc('rss_fetch_total', source=source.name, status=fetched['status'])
+        METRICS.observe('rss_fetch_seconds', fetch_time, source=source.name)
+        METRICS.inc('rss_fetch_bytes_total', fetched['bytes'], source=source.name)
+        if fetched['status'] == 'ok':
+            METRICS.observe('rss_parse_seconds', fetched['parse_seconds'], source=source.name)
+            METRICS.inc('rss_entries_seen_total', len(fetched['feed'].entries), source=source.name)
+            METRICS.inc('rss_entries_new_total', new_articles, source=source.name)
+        stats['bytes'] += fetched['bytes']
+        if fetched['status'] != 'ok':
+            stats['unchanged'] += 1
+        stats['latencies'][source.name] = {
+            'fetch': round(fetch_time, 3),
+            'store': round(store_time, 3),
+            'total': round(fetch_time + store_time, 3)
+        }
+        stats['new_articles'] += new_articles
+        stats['successful'] += 1
+        logger.info(f"RSS源 {source.name} 完成，新增 {new_articles} 篇文章"
+                    f"（下载解析 {fetch_time:.2f}s，入库 {store_time:.2f}s）")
+    
+    @staticmethod
+    def _fetch_serially(sources, progress=None):
+        """逐个抓取RSS源"""
+        stats = RSSFetcher._new_run_stats(1)
+        for i, source in enumerate(sources):
+            try:
+                logger.debug("正在处理RSS源 %d/%d: %s (URL: %s)", i + 1, len(sources), source.name, source.url)
+                fetch_started = time.perf_counter()
+                fetched = RSSFetcher.download_source(source)
+                store_started = time.perf_counter()
+                fetched['prepared'] = RSSFetcher._wait_prepared(source, RSSFetcher.prepare_feed(source, fetched))
+                new_articles = IngestWriter.call(RSSFetcher.store_feed, source.id, fetched)
+                RSSFetcher._record_source(stats, source, fetched, store_started - fetch_started, store_started, new_articles)
+                RSSFetcher._notify(progress, {'type': 'source', 'source': source.name,
+                                              'status': fetched['status'], 'new_articles': new_articles})
+                
+            except Exception as e:
+                RSSFetcher._fetch_failed(stats, source, e, progress)
+                continue
+        return stats
+    
+    @staticmethod
+    def _fetch_concurrently(sources, workers, progress=None):
+        """在线程池中并发下载解析RSS源，下载完成的源先在 SummaryPool 中预处理，再交给 IngestWriter 批量入库"""
+        stats = RSSFetcher._new_run_stats(workers)
+        limiter = HostLimiter(app.config.get('RSS_FETCH_PER_HOST', 2))
+        
+        def download(url, etag, last_modified, content_hash):
+            with limiter.limit(url):
+                fetch_started = time.perf_counter()
+                fetched = RSSFetcher.download_feed(url, etag, last_modified, content_hash)
+                return fetched, time.perf_counter() - fetch_started
+        
+        logger.info(f"使用 {workers} 个线程并发抓取，每个主机最多 {limiter.per_host} 个并发请求")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rss-fetch') as executor:
+            # 工作线程只接触URL和校验信息，ORM对象始终留在当前线程
+            downloads = {
+                executor.submit(download, source.url, source.etag, source.last_modified, source.content_hash): source
+                for source in sources
+            }
+            prepares = {}  # 预处理 future -> (源, 下载结果, 下载耗时, 提交时间)
+            stores = {}  # 入库 future -> (源, 下载结果, 下载耗时, 提交时间)
+            pending = set(downloads)
+            
+            def store(source, fetched, fetch_time, store_started):
+                future = IngestWriter.submit(RSSFetcher.store_feed, source.id, fetched)
+                stores[future] = (source, fetched, fetch_time, store_started)
+                pending.add(future)
+            
+            # 下载完成的源立即提交入库，写线程把排队的多个源合并到一个事务中，
+            # 入库与其余源的下载解析重叠进行
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in downloads:
+                        source = downloads[future]
+                        try:
+                            fetched, fetch_time = future.result()
+                        except Exception as e:
+                            RSSFetcher._fetch_failed(stats, source, e, progress)
+                            continue
+                        logger.debug("RSS源下载完成: %s (URL: %s)", source.name, source.url)
+                        store_started = time.perf_counter()
+                        try:
+                            prepare = RSSFetcher.prepare_feed(source, fetched)
+                        except Exception as e:
+                            logger.warning(f"预处理RSS源 {source.name} 的文章失败，改为入库时处理: {str(e)}")
+                            prepare = None
+                        if prepare is None:
+                            store(source, fetched, fetch_time, store_started)
+                        else:
+                            # 进程池处理期间继续等待其他源的下载
+                            prepares[prepare] = (source, fetched, fetch_time, store_started)
+                            pending.add(prepare)
+                        continue
+                    
+                    if future in prepares:
+                        source, fetched, fetch_time, store_started = prepares.pop(future)
+                        fetched['prepared'] = RSSFetcher._wait_prepared(source, future)
+                        store(source, fetched, fetch_time, store_started)
+                        continue
+                    
+                    source, fetched, fetch_time, store_started = stores.pop(future)
+                    try:
+                        new_articles = future.result()
+                    except Exception as e:
+                        RSSFetcher._fetch_failed(stats, source, e, progress)
+                        continue
+                    RSSFetcher._record_source(stats, source, fetched, fetch_time, store_started, new_articles)
+                    RSSFetcher._notify(progress, {'type': 'source', 'source': source.name,
+                                                  'status': fetched['status'], 'new_articles': new_articles})
+        return stats
+    
+    @staticmethod
+    def _fetch_failed(stats, source, error, progress):
+        stats['failed'] += 1
+        logger.error(f"处理RSS源 {source.name} 时出错: {str(error)}")
+        RSSFetcher._record_failure(source)
+        RSSFetcher._notify(progress, {'type': 'error', 'source': source.name, 'message': str(error)})
+
+# 历史文章回填
+class FeedBackfill:
+    """在后台补齐RSS源的历史文章
+    
+    新RSS源第一次抓取只处理最新的 FEED_INITIAL_ENTRIES 篇，当前文档中其余的条目，以及 RFC 5005
+    分页（rel="next" / rel="prev-archive"）指向的更早的页面，由定时任务重新下载后分批入库。
+    每个源最多读取 BACKFILL_MAX_PAGES 页、BACKFILL_MAX_ENTRIES 篇，每批 BACKFILL_BATCH_SIZE 篇是写线程中的一个短事务。
+    两次抓取之间的新文章超出了当前文档、且RSS源提供分页时，也会标记为待回填。
+    """
+    PAGE_RELS = ('next', 'prev-archive')
+    
+    # 最近一轮的回填统计
+    last_run = {}
+    
+    @staticmethod
+    def next_page(feed, base_url=None):
+        """RSS源文档中指向更早文章的分页链接，没有时返回 None"""
+        for link in feed.get('feed', {}).get('links', []):
+            if link.get('rel') in FeedBackfill.PAGE_RELS and link.get('href'):
+                return urljoin(base_url, link['href']) if base_url else link['href']
+        return None
+    
+    @staticmethod
+    def backfill(source):
+        """回填一个RSS源，返回 (新增文章数, 读取的页数, 处理的条目数)"""
+        max_pages = app.config['BACKFILL_MAX_PAGES']
+        max_entries = app.config['BACKFILL_MAX_ENTRIES']
+        batch_size = app.config['BACKFILL_BATCH_SIZE']
+        url = source.url
+        visited = set()
+        pages = processed = new_articles = 0
+        while url and url not in visited and pages < max_pages and processed < max_entries:
+            visited.add(url)
+            feed = RSSFetcher.download_feed(url)['feed']
+            pages += 1
+            entries = feed.entries[:max_entries - processed]
+            processed += len(entries)
+            for start in range(0, len(entries), batch_size):
+                batch = entries[start:start + batch_size]
+                prepared = RSSFetcher._wait_prepared(source, RSSFetcher.prepare(batch))
+                new_articles += IngestWriter.call(RSSFetcher.store_backfill, source.id, batch, prepared)
+            url = FeedBackfill.next_page(feed, url)
+        return new_articles, pages, processed
+    
+    @staticmethod
+    def _set_status(source_id, status):
+        source = db.session.get(RSSSource, source_id)
+        if source is not None:
+            source.backfill_status = status
+    
+    @staticmethod
+    def run(max_sources=None):
+        """回填等待中的RSS源，每轮最多 BACKFILL_SOURCES_PER_RUN 个，返回统计"""
+        started = time.perf_counter()
+        sources = RSSSource.query.filter_by(backfill_status='pending', active=True).order_by(RSSSource.id).limit(
+            max_sources or app.config['BACKFILL_SOURCES_PER_RUN']
+        ).all()
+        stats = {'sources': len(sources), 'failed': 0, 'pages': 0, 'entries': 0, 'new_articles': 0}
+        for source in sources:
+            try:
+                new_articles, pages, processed = FeedBackfill.backfill(source)
+            except Exception as e:
+                logger.warning(f"回填RSS源 {source.name} 失败: {str(e)}")
+                stats['failed'] += 1
+                IngestWriter.call(FeedBackfill._set_status, source.id, 'failed')
+                continue
+            stats['pages'] += pages
+            stats['entries'] += processed
+            stats['new_articles'] += new_articles
+            IngestWriter.call(FeedBackfill._set_status, source.id, 'done')
+            logger.info(f"RSS源 {source.name} 回填完成，读取 {pages} 页 {processed} 篇，新增 {new_articles} 篇文章")
+        # 写线程已经提交，让当前会话重新读取最新数据
+        db.session.expire_all()
+        
+        stats['elapsed'] = round(time.perf_counter() - started, 3)
+        stats['finished_at'] = datetime.utcnow().isoformat()
+        FeedBackfill.last_run = stats
+        return stats
+    
+    @staticmethod
+    def stats():
+        """各回填状态的RSS源数和最近一轮的统计"""
+        counts = dict(db.session.query(RSSSource.backfill_status, db.func.count(RSSSource.id)).filter(
+            RSSSource.backfill_status.isnot(None)
+        ).group_by(RSSSource.backfill_status).all())
+        return {
+            'pending': counts.get('pending', 0),
+            'done': counts.get('done', 0),
+            'failed': counts.get('failed', 0),
+            'last_run': FeedBackfill.last_run
+        }
+
+# 手动抓取任务
+class FetchJobs:
+    """后台任务：手动触发的抓取和OPML导入后的检查
+    
+    同一时间最多只有一个抓取任务在运行，重复点击会加入正在运行的任务。
+    任务在后台线程中执行，每个源的进度作为事件追加到任务中，供状态接口和SSE流读取。
+    """
+    MAX_JOBS = 20  # 内存中保留的最近任务数
+    
+    jobs = {}
+    current_id = None
+    _condition = threading.Condition()
+    
+    @staticmethod
+    def start(kind='fetch', runner=None):
+        """启动后台任务，返回 (任务, 是否新建)
+        
+        runner 以 progress 回调调用，返回值记为任务的 result；不传时执行抓取，
+        已有抓取任务在运行时直接返回它。
+        """
+        with FetchJobs._condition:
+            if runner is None:
+                current = FetchJobs.jobs.get(FetchJobs.current_id)
+                if current and current['status'] in ('queued', 'running'):
+                    return current, False
+            
+            job = {
+                'id': uuid.uuid4().hex[:12],
+                'kind': kind,
+                'status': 'queued',
+                'created_at': datetime.utcnow().isoformat(),
+                'finished_at': None,
+                'total': 0,
+                'completed': 0,
+                'new_articles': 0,
+                'errors': [],
+                'result': None,
+                'events': []
+            }
+            FetchJobs.jobs[job['id']] = job
+            if runner is None:
+                FetchJobs.current_id = job['id']
+            FetchJobs._prune()
+        
+        worker = threading.Thread(target=FetchJobs._run, args=(job, runner or FetchJobs._fetch),
+                                  name=f"{kind}-job-{job['id']}")
+        worker.daemon = True
+        worker.start()
+        return job, True
+    
+    @staticmethod
+    def _prune():
+        finished = [job_id for job_id, job in FetchJobs.jobs.items() if job['status'] in ('done', 'failed')]
+        for job_id in finished[:max(len(FetchJobs.jobs) - FetchJobs.MAX_JOBS, 0)]:
+            del FetchJobs.jobs[job_id]
+    
+    @staticmethod
+    def _publish(job, event):
+        """记录一条进度事件并唤醒等待中的SSE连接"""
+        with FetchJobs._condition:
+            if event['type'] == 'start':
+                job['status'] = 'running'
+                job['total'] = event['total']
+            elif event['type'] == 'source':
+                job['completed'] += 1
+                job['new_articles'] += event.get('new_articles', 0)
+            elif event['type'] == 'error':
+                job['completed'] += 1
+                job['errors'].append({'source': event['source'], 'message': event['message']})
+            event['id'] = len(job['events'])
+            job['events'].append(event)
+            FetchJobs._condition.notify_all()
+    
+    @staticmethod
+    def _fetch(progress):
+        # 等待正在进行的定时抓取结束
+        with RSSFetcher.run_lock, app.app_context():
+            RSSFetcher.fetch_all_sources(progress=progress)
+    
+    @staticmethod
+    def _run(job, runner):
+        try:
+            job['result'] = runner(lambda event: FetchJobs._publish(job, event))
+            job['status'] = 'done'
+            logger.info(f"后台任务 {job['kind']}/{job['id']} 完成，获得 {job['new_articles']} 篇新文章")
+        except Exception as e:
+            job['status'] = 'failed'
+            job['errors'].append({'source': None, 'message': str(e)})
+            logger.error(f"后台任务 {job['kind']}/{job['id']} 出错: {str(e)}")
+        job['finished_at'] = datetime.utcnow().isoformat()
+        FetchJobs._publish(job, {'type': 'done', 'status': job['status'], 'new_articles': job['new_articles']})
+    
+    @staticmethod
+    def snapshot(job):
+        """任务状态，不包含事件列表"""
+        with FetchJobs._condition:
+            return {key: value for key, value in job.items() if key != 'events'}
+    
+    @staticmethod
+    def events(job, after=-1, keepalive=15):
+        """按顺序产出 after 之后的事件，任务结束后停止；长时间没有事件时产出 None 作为心跳"""
+        position = after + 1
+        while True:
+            with FetchJobs._condition:
+                # 断线重连时已经收到过 done 事件，直接结束，否则会一直发送心跳
+                if position >= len(job['events']) and job['events'] and job['events'][-1]['type'] == 'done':
+                    return
+                if position >= len(job['events']):
+                    FetchJobs._condition.wait(timeout=keepalive)
+                pending = job['events'][position:]
+            if not pending:
+                yield None
+                continue
+            for event in pending:
+                yield event
+                if event['type'] == 'done':
+                    return
+            position += len(pending)
+
+# OPML导入导出
+class OPMLSources:
+    """RSS源列表的OPML导入导出
+    
+    导出时按分类分组；导入时分类取 outline 的 category 属性，没有时取外层分组的标题。
+    新的RSS源先以停用状态加入，再在后台任务中并发下载检查（按主机限制并发），
+    能访问的源启用后由首次抓取入库，不在请求中抓取。
+    """
+    @staticmethod
+    def export(sources):
+        root = ET.Element('opml', version='2.0')
+        head = ET.SubElement(root, 'head')
+        ET.SubElement(head, 'title').text = '游戏开发RSS聚合器订阅列表'
+        ET.SubElement(head, 'dateCreated').text = datetime.now(timezone.utc).strftime('%a, %d %b %Y %H:%M:%S GMT')
+        body = ET.SubElement(root, 'body')
+        groups = {}
+        for source in sorted(sources, key=lambda source: (source.category or '', source.name)):
+            group = groups.get(source.category)
+            if group is None:
+                group = groups[source.category] = ET.SubElement(body, 'outline', text=source.category, title=source.category)
+            ET.SubElement(group, 'outline', type='rss', text=source.name, title=source.name,
+                          xmlUrl=source.url, category=source.category)
+        ET.indent(root)
+        return ET.tostring(root, encoding='utf-8', xml_declaration=True)
+    
+    @staticmethod
+    def parse(data):
+        """返回OPML中的RSS源列表 [{'name', 'url', 'category'}]，格式错误时抛出 ValueError"""
+        try:
+            root = ET.fromstring(data)
+        except ET.ParseError as e:
+            raise ValueError(f"OPML格式错误: {str(e)}")
+        body = root.find('body')
+        if root.tag != 'opml' or body is None:
+            raise ValueError('不是OPML文件')
+        
+        entries = []
+        def walk(element, group):
+            for outline in element.findall('outline'):
+                url = (outline.get('xmlUrl') or '').strip()
+                name = outline.get('text') or outline.get('title') or ''
+                if url:
+                    category = outline.get('category') or group or 'general'
+                    # 部分阅读器用 /分类1,/分类2 的形式，取第一个
+                    category = category.split(',')[0].strip('/ ') or 'general'
+                    entries.append({'name': (name or url)[:100], 'url': url[:500], 'category': category[:50]})
+                else:
+                    walk(outline, name or group)
+        walk(body, None)
+        return entries
+    
+    @staticmethod
+    def validate(entries, progress=None):
+        """并发下载每个RSS源，为每一项补充 reachable / entries / error
+        
+        progress 不为空时，每个源检查完成后以事件字典调用一次（格式同抓取任务）。
+        """
+        limiter = HostLimiter(app.config['RSS_FETCH_PER_HOST'])
+        
+        def check(entry):
+            with limiter.limit(entry['url']):
+                fetched = RSSFetcher.download_feed(entry['url'])
+            feed = fetched['feed']
+            # feedparser 无法识别格式时 version 为空
+            if feed is None or (not feed.get('version') and not feed.entries):
+                raise ValueError('不是有效的RSS/Atom源')
+            return len(feed.entries)
+        
+        if not entries:
+            return entries
+        workers = min(app.config['OPML_VALIDATE_WORKERS'], len(entries))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='opml-check') as executor:
+            futures = {executor.submit(check, entry): entry for entry in entries}
+            for future in as_completed(futures):
+                entry = futures[future]
+                try:
+                    entry['entries'] = future.result()
+                    entry['reachable'] = True
+                    entry['error'] = None
+                except Exception as e:
+                    entry['entries'] = 0
+                    entry['reachable'] = False
+                    entry['error'] = str(e)[:200]
+                if entry['reachable']:
+                    RSSFetcher._notify(progress, {'type': 'source', 'source': entry['name'], 'url': entry['url'],
+                                                  'entries': entry['entries']})
+                else:
+                    RSSFetcher._notify(progress, {'type': 'error', 'source': entry['name'], 'url': entry['url'],
+                                                  'message': entry['error']})
+        return entries
+    
+    @staticmethod
+    def check_imported(source_ids, include_unreachable, progress=None):
+        """检查导入的RSS源并启用能访问的源（include_unreachable 时全部启用），返回检查结果"""
+        with app.app_context():
+            sources = RSSSource.query.filter(RSSSource.id.in_(source_ids)).all()
+            entries = [{'id': source.id, 'name': source.name, 'url': source.url, 'category': source.category}
+                       for source in sources]
+            # 会话在检查期间不持有连接
+            db.session.rollback()
+            RSSFetcher._notify(progress, {'type': 'start', 'total': len(entries)})
+            OPMLSources.validate(entries, progress)
+            
+            enabled = [entry['id'] for entry in entries if entry['reachable'] or include_unreachable]
+            if enabled:
+                RSSSource.query.filter(RSSSource.id.in_(enabled)).update({'active': True}, synchronize_session=False)
+                db.session.commit()
+                RSSFetcher.queue_due_sources()
+            unreachable = sum(1 for entry in entries if not entry['reachable'])
+            logger.info(f"OPML导入检查完成：{len(entries)} 个源，启用 {len(enabled)} 个，无法访问 {unreachable} 个")
+            return {'enabled': len(enabled), 'unreachable': unreachable, 'sources': entries}
+
+# 后台全文提取
+class ExtractionQueue:
+    """持久化的全文提取队列
+    
+    入库时为新文章创建任务，定时任务每轮领取一批到期的任务，在线程池中下载页面
+    （按主机限制请求频率）并重新生成摘要，结果通过写线程写回文章。
+    失败的任务按指数退避重试，超过最大次数后标记为 failed。
+    """
+    RETRY_DELAY = 60  # 第一次重试的等待秒数，之后每次翻倍
+    STALE_AFTER = timedelta(minutes=10)  # running 状态超过这个时间视为进程中断，重新领取
+    
+    # 最近一轮的处理统计
+    last_batch = {}
+    
+    @staticmethod
+    def enqueue(article_ids):
+        """为文章创建提取任务，由调用方提交事务"""
+        if not article_ids:
+            return
+        now = datetime.utcnow()
+        rows = [
+            {'article_id': article_id, 'status': 'pending', 'attempts': 0,
+             'next_attempt_at': now, 'created_at': now, 'updated_at': now}
+            for article_id in article_ids
+        ]
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            statement = sqlite_insert(ExtractionJob).values(rows[start:start + INSERT_BATCH_SIZE]).on_conflict_do_nothing()
+            db.session.execute(statement)
+    
+    @staticmethod
+    def _claim(limit):
+        """领取到期的任务并标记为 running，在写线程中执行
+        
+        返回普通字典而不是ORM对象，调用方不需要访问写线程的会话。
+        """
+        now = datetime.utcnow()
+        rows = db.session.query(ExtractionJob, Article).outerjoin(
+            Article, Article.id == ExtractionJob.article_id
+        ).filter(
+            db.or_(
+                db.and_(ExtractionJob.status == 'pending', ExtractionJob.next_attempt_at <= now),
+                db.and_(ExtractionJob.status == 'running', ExtractionJob.updated_at < now - ExtractionQueue.STALE_AFTER)
+            )
+        ).order_by(ExtractionJob.next_attempt_at).limit(limit).all()
+        
+        claimed = []
+        for job, article in rows:
+            if article is None:
+                # 文章已被删除
+                db.session.delete(job)
+                continue
+            job.status = 'running'
+            job.updated_at = now
+            claimed.append({
+                'job_id': job.id,
+                'url': article.url,
+                'title': article.title,
+                'description': article.description
+            })
+        return claimed
+    
+    @staticmethod
+    def _save_results(results):
+        """写回提取结果并更新任务状态，在写线程中执行"""
+        now = datetime.utcnow()
+        jobs = {job.id: job for job in ExtractionJob.query.filter(ExtractionJob.id.in_([r['job_id'] for r in results]))}
+        SummaryCache.put_many({result['summary_key']: result['summary'] for result in results if result['summary']})
+        for result in results:
+            job = jobs.get(result['job_id'])
+            if job is None:
+                continue
+            job.attempts += 1
+            job.updated_at = now
+            if result['error'] is None:
+                if result['content']:
+                    db.session.execute(
+                        db.update(Article)
+                        .where(Article.id == job.article_id)
+                        .values(content=result['content'], summary=result['summary'], summary_key=result['summary_key'])
+                    )
+                    PageCache.touch()
+                job.status = 'done'
+                job.last_error = None
+            else:
+                job.last_error = result['error'][:500]
+                if job.attempts >= app.config['EXTRACTION_MAX_ATTEMPTS']:
+                    job.status = 'failed'
+                    logger.warning(f"全文提取失败，不再重试 {result['url']}: {result['error']}")
+                else:
+                    job.status = 'pending'
+                    delay = ExtractionQueue.RETRY_DELAY * 2 ** (job.attempts - 1)
+                    job.next_attempt_at = now + timedelta(seconds=delay)
+                    logger.info(f"全文提取失败，{delay} 秒后重试 {result['url']}: {result['error']}")
+    
+    @staticmethod
+    def process_batch():
+        """处理一批到期的提取任务，返回成功的数量
+        
+        领取任务和写回结果都交给 IngestWriter，页面在线程池中下载，摘要由 SummaryPool 批量生成。
+        """
+        started = time.perf_counter()
+        jobs = IngestWriter.call(ExtractionQueue._claim, app.config['EXTRACTION_BATCH_SIZE'])
+        if not jobs:
+            return 0
+        
+        limiter = HostRateLimiter(app.config['EXTRACTION_HOST_INTERVAL'])
+        
+        def extract(url):
+            limiter.wait(url)
+            return ContentProcessor.fetch_article_text(url)
+        
+        results = []
+        extracted = []
+        summary_inputs = []
+        with ThreadPoolExecutor(max_workers=app.config['EXTRACTION_WORKERS'], thread_name_prefix='extract') as executor:
+            futures = {executor.submit(extract, job['url']): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                result = {'job_id': job['job_id'], 'url': job['url'], 'content': None, 'summary': None,
+                          'summary_key': None, 'error': None}
+                try:
+                    result['content'] = future.result()
+                except Exception as e:
+                    result['error'] = str(e)
+                results.append(result)
+                if result['content']:
+                    extracted.append(result)
+                    summary_inputs.append((job['title'], job['description'], result['content']))
+        summaries, keys, _ = SummaryCache.summarize(summary_inputs)
+        for result, summary, key in zip(extracted, summaries, keys):
+            result['summary'] = summary
+            result['summary_key'] = key
+        IngestWriter.call(ExtractionQueue._save_results, results)
+        
+        succeeded = sum(1 for result in results if result['error'] is None)
+        failed = len(results) - succeeded
+        elapsed = time.perf_counter() - started
+        ExtractionQueue.last_batch = {
+            'jobs': len(jobs),
+            'succeeded': succeeded,
+            'failed': failed,
+            'elapsed': round(elapsed, 3),
+            'finished_at': datetime.utcnow().isoformat()
+        }
+        logger.info(f"全文提取完成 {succeeded}/{len(jobs)} 篇，失败 {failed} 篇，耗时 {elapsed:.2f}s")
+        return succeeded
+    
+    @staticmethod
+    def stats():
+        """队列深度和吞吐量"""
+        counts = dict(db.session.query(ExtractionJob.status, db.func.count(ExtractionJob.id)).group_by(ExtractionJob.status).all())
+        hour_ago = datetime.utcnow() - timedelta(hours=1)
+        done_last_hour = ExtractionJob.query.filter(
+            ExtractionJob.status == 'done', ExtractionJob.updated_at >= hour_ago
+        ).count()
+        return {
+            'pending': counts.get('pending', 0),
+            'running': counts.get('running', 0),
+            'done': counts.get('done', 0),
+            'failed': counts.get('failed', 0),
+            'done_last_hour': done_last_hour,
+            'last_batch': ExtractionQueue.last_batch
+        }
+
+METRICS.gauge('extraction_jobs', '全文提取队列中各状态的任务数', ('status',),
+              lambda: {(status,): count for status, count in db.session.query(
+                  ExtractionJob.status, db.func.count(ExtractionJob.id)).group_by(ExtractionJob.status)})
+
+# 冷数据归档
+class ArticleArchive:
+    """把旧文章移入 archived_article 表
+    
+    发布时间超过 ARCHIVE_AFTER_DAYS 的文章，以及已读且入库超过 ARCHIVE_READ_AFTER_DAYS 的文章，
+    分批从 article 表移到归档表，描述、正文和摘要用 zlib 压缩。每批是写线程中的一个短事务，
+    批与批之间其他写任务可以插队，不会长时间占用写锁。
+    归档后的文章仍可以通过原ID访问，也可以按标题搜索，但不再出现在文章列表和分类计数中。
+    """
+    # 最近一轮的归档统计
+    last_run = {}
+    
+    @staticmethod
+    def _conditions(now):
+        conditions = []
+        if app.config['ARCHIVE_AFTER_DAYS'] is not None:
+            cutoff = now - timedelta(days=app.config['ARCHIVE_AFTER_DAYS'])
+            # 与 coalesce(published_date, created_at) < cutoff 等价，拆开后两个分支都能使用 ix_article_published_id
+            conditions.append(db.or_(
+                Article.published_date < cutoff,
+                db.and_(Article.published_date.is_(None), Article.created_at < cutoff)
+            ))
+        if app.config['ARCHIVE_READ_AFTER_DAYS'] is not None:
+            cutoff = now - timedelta(days=app.config['ARCHIVE_READ_AFTER_DAYS'])
+            conditions.append(db.and_(Article.read_status.is_(True), Article.created_at < cutoff))
+        return conditions
+    
+    @staticmethod
+    def _archive_batch(limit):
+        """归档一批文章，在写线程中执行，由写线程提交事务
+        
+        返回 {'selected', 'archived', 'raw_bytes', 'stored_bytes'}。
+        """
+        result = {'selected': 0, 'archived': 0, 'raw_bytes': 0, 'stored_bytes': 0}
+        conditions = ArticleArchive._conditions(datetime.utcnow())
+        if not conditions:
+            return result
+        
+        rows = db.session.execute(
+            db.select(Article.__table__, RSSSource.category)
+            .join(RSSSource, RSSSource.id == Article.source_id)
+            .where(db.or_(*conditions))
+            # 不按ID排序，否则 SQLite 会按主键扫描整张表，而不是用索引分别查找每个条件
+            .limit(limit)
+        ).mappings().all()
+        result['selected'] = len(rows)
+        if not rows:
+            return result
+        
+        archive_rows = []
+        categories = {}
+        for row in rows:
+            payload = ArchivedArticle.pack(row['description'], row['content'], row['summary'])
+            result['raw_bytes'] += sum(len((row[name] or '').encode('utf-8')) for name in ('description', 'content', 'summary'))
+            result['stored_bytes'] += len(payload)
+            categories[row['id']] = (row['category'], bool(row['read_status']))
+            archive_rows.append({
+                'id': row['id'],
+                'title': row['title'],
+                'url': row['url'],
+                'url_hash': row['url_hash'],
+                'author': row['author'],
+                'published_date': row['published_date'],
+                'source_id': row['source_id'],
+                'tags': row['tags'],
+                'read_status': bool(row['read_status']),
+                'created_at': row['created_at'],
+                'archived_at': datetime.utcnow(),
+                'payload': payload
+            })
         
-        # 组合摘要
-        summary = '\n'.join(summary_parts)
+        # ID已经存在于归档表的文章留在原表，不会丢失数据
+        archived_ids = []
+        for start in range(0, len(archive_rows), INSERT_BATCH_SIZE):
+            statement = (
+                sqlite_insert(ArchivedArticle)
+                .values(archive_rows[start:start + INSERT_BATCH_SIZE])
+                .on_conflict_do_nothing()
+                .returning(ArchivedArticle.id)
+            )
+            archived_ids.extend(db.session.execute(statement).scalars())
+        if not archived_ids:
+            return result
         
-        # 限制总长度
-        if len(summary) > 500:
-            lines = summary.split('\n')
-            summary = '\n'.join(lines[:8]) + '\n...'
+        ExtractionJob.query.filter(ExtractionJob.article_id.in_(archived_ids)).delete(synchronize_session=False)
+        ArticleFingerprint.query.filter(ArticleFingerprint.article_id.in_(archived_ids)).delete(synchronize_session=False)
+        Article.query.filter(Article.id.in_(archived_ids)).delete(synchronize_session=False)
         
-        return summary
+        per_category = {}
+        for article_id in archived_ids:
+            category, read = categories[article_id]
+            total, unread = per_category.get(category, (0, 0))
+            per_category[category] = (total + 1, unread + (0 if read else 1))
+        for category, (total, unread) in per_category.items():
+            CategoryStat.apply(category, articles=-total, unread=-unread)
+        PageCache.touch()
+        
+        result['archived'] = len(archived_ids)
+        return result
     
     @staticmethod
-    def _analyze_sentence(sentence, tech_categories, impl_keywords, prob_keywords, result_keywords):
-        """分析句子的技术相关性和类型"""
-        sentence_lower = sentence.lower()
+    def compact(max_batches=None):
+        """执行一轮归档，返回统计；finished 为 False 表示还有文章留到下一轮"""
+        started = time.perf_counter()
+        batch_size = app.config['ARCHIVE_BATCH_SIZE']
+        max_batches = max_batches or app.config['ARCHIVE_MAX_BATCHES']
+        stats = {'batches': 0, 'archived': 0, 'raw_bytes': 0, 'stored_bytes': 0, 'finished': True}
         
-        analysis = {
-            'text': sentence,
-            'tech_areas': [],
-            'type': 'general',
-            'relevance_score': 0,
-            'keywords': []
-        }
-        
-        # 检查技术领域
-        for area, keywords in tech_categories.items():
-            for keyword in keywords:
-                if keyword in sentence_lower:
-                    analysis['tech_areas'].append(area)
-                    analysis['keywords'].append(keyword)
-                    analysis['relevance_score'] += 2
-        
-        # 确定句子类型
-        if any(kw in sentence_lower for kw in impl_keywords):
-            analysis['type'] = 'implementation'
-            analysis['relevance_score'] += 3
-        elif any(kw in sentence_lower for kw in prob_keywords):
-            analysis['type'] = 'problem'
-            analysis['relevance_score'] += 2
-        elif any(kw in sentence_lower for kw in result_keywords):
-            analysis['type'] = 'result'
-            analysis['relevance_score'] += 2
-        elif any(word in sentence_lower for word in ['新', 'new', '创新', 'innovative', '提出', 'propose']):
-            analysis['type'] = 'argument'
-            analysis['relevance_score'] += 2
-        
-        # 额外加分项
-        if re.search(r'\d+%|\d+倍|\d+x', sentence):  # 包含数字/百分比
-            analysis['relevance_score'] += 1
-        if len(sentence) > 30 and len(sentence) < 150:  # 长度适中
-            analysis['relevance_score'] += 1
+        while stats['batches'] < max_batches:
+            result = IngestWriter.call(ArticleArchive._archive_batch, batch_size)
+            if result['selected'] == 0:
+                break
+            stats['batches'] += 1
+            for key in ('archived', 'raw_bytes', 'stored_bytes'):
+                stats[key] += result[key]
+            if result['selected'] < batch_size:
+                break
+        else:
+            stats['finished'] = False
         
-        return analysis
+        stats['elapsed'] = round(time.perf_counter() - started, 3)
+        stats['finished_at'] = datetime.utcnow().isoformat()
+        ArticleArchive.last_run = stats
+        if stats['archived']:
+            logger.info(
+                f"归档了 {stats['archived']} 篇文章，文本 {stats['raw_bytes'] // 1024} KB "
+                f"压缩为 {stats['stored_bytes'] // 1024} KB，耗时 {stats['elapsed']:.2f}s"
+            )
+        return stats
     
     @staticmethod
-    def _extract_tech_areas(analyzed_sentences):
-        """提取主要技术领域"""
-        area_count = {}
-        for sentence in analyzed_sentences:
-            for area in sentence['tech_areas']:
-                area_count[area] = area_count.get(area, 0) + 1
+    def get(article_id):
+        return ArchivedArticle.query.options(joinedload(ArchivedArticle.source)).filter_by(id=article_id).first()
+    
+    @staticmethod
+    def search(search, category=None, limit=20):
+        """按标题搜索归档文章"""
+        query = ArchivedArticle.query.join(ArchivedArticle.source).options(contains_eager(ArchivedArticle.source))
+        if category:
+            query = query.filter(RSSSource.category == category)
+        return query.filter(ArchivedArticle.title.contains(search)).order_by(
+            ArchivedArticle.published_date.desc(), ArchivedArticle.id.desc()
+        ).limit(limit).all()
+    
+    @staticmethod
+    def stats():
+        count, stored = db.session.query(
+            db.func.count(ArchivedArticle.id), db.func.sum(db.func.length(ArchivedArticle.payload))
+        ).one()
+        return {'articles': count, 'stored_bytes': stored or 0, 'last_run': ArticleArchive.last_run}
+
+# 全文搜索
+class SearchIndex:
+    """基于 SQLite FTS5 的文章全文索引
+    
+    article_fts 是 article 表的外部内容索引，由触发器在插入、删除和更新时增量维护。
+    使用 trigram 分词器，保持与原来 contains() 一致的子串匹配语义，也能直接匹配中文。
+    SQLite 没有编译 FTS5 时退回 LIKE 查询。
+    """
+    _available = None
+    
+    # 各列在 bm25 排序中的权重：title, description, summary, tags
+    RANK_WEIGHTS = (10.0, 2.0, 1.0, 5.0)
+    
+    SETUP_STATEMENTS = [
+        """CREATE TRIGGER IF NOT EXISTS article_fts_ai AFTER INSERT ON article BEGIN
+            INSERT INTO article_fts(rowid, title, description, summary, tags)
+            VALUES (new.id, new.title, new.description, new.summary, new.tags);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS article_fts_ad AFTER DELETE ON article BEGIN
+            INSERT INTO article_fts(article_fts, rowid, title, description, summary, tags)
+            VALUES ('delete', old.id, old.title, old.description, old.summary, old.tags);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS article_fts_au AFTER UPDATE OF title, description, summary, tags ON article BEGIN
+            INSERT INTO article_fts(article_fts, rowid, title, description, summary, tags)
+            VALUES ('delete', old.id, old.title, old.description, old.summary, old.tags);
+            INSERT INTO article_fts(rowid, title, description, summary, tags)
+            VALUES (new.id, new.title, new.description, new.summary, new.tags);
+        END"""
+    ]
+    
+    @staticmethod
+    def setup():
+        """创建全文索引和同步触发器，首次创建时为已有文章建立索引"""
+        if SearchIndex.is_available():
+            # 触发器属于文章表，重建文章表后需要补上
+            for statement in SearchIndex.SETUP_STATEMENTS:
+                db.session.execute(text(statement))
+            db.session.commit()
+            return True
+        try:
+            db.session.execute(text(
+                "CREATE VIRTUAL TABLE article_fts USING fts5("
+                "title, description, summary, tags, "
+                "content='article', content_rowid='id', tokenize='trigram')"
+            ))
+            for statement in SearchIndex.SETUP_STATEMENTS:
+                db.session.execute(text(statement))
+            db.session.execute(text("INSERT INTO article_fts(article_fts) VALUES ('rebuild')"))
+            db.session.commit()
+            SearchIndex._available = True
+            logger.info("已创建全文搜索索引")
+        except Exception as e:
+            db.session.rollback()
+            SearchIndex._available = False
+            logger.warning(f"SQLite 不支持 FTS5，搜索将使用 LIKE 查询: {str(e)}")
+        return SearchIndex._available
+    
+    @staticmethod
+    def is_available():
+        if SearchIndex._available is None:
+            exists = db.session.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='article_fts'"
+            )).first()
+            SearchIndex._available = exists is not None
+        return SearchIndex._available
+    
+    @staticmethod
+    def _match_expression(search):
+        """把用户输入转换为 FTS5 查询，每个词作为短语，多个词之间为 AND
         
-        # 返回出现频率最高的技术领域
-        sorted_areas = sorted(area_count.items(), key=lambda x: x[1], reverse=True)
-        return [area for area, count in sorted_areas[:3]]
+        trigram 分词器无法匹配少于3个字符的词，这种情况返回 None。
+        """
+        terms = search.split()
+        if not terms or any(len(term) < 3 for term in terms):
+            return None
+        return ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
     
     @staticmethod
-    def _extract_key_points_structured(analyzed_sentences, point_type):
-        """提取特定类型的关键点"""
-        points = []
-        for sentence in analyzed_sentences:
-            if sentence['type'] == point_type and sentence['relevance_score'] >= 3:
-                simplified = ContentProcessor._simplify_to_chinese(sentence['text'])
-                if simplified and len(simplified) > 10:
-                    points.append(simplified)
+    def filter(query, search):
+        """为文章查询加上搜索条件，返回 (query, 是否已按相关性排序)"""
+        match = SearchIndex._match_expression(search)
+        if match is None or not SearchIndex.is_available():
+            return query.filter(
+                db.or_(
+                    Article.title.contains(search),
+                    Article.description.contains(search),
+                    Article.summary.contains(search),
+                    Article.tags.contains(search)
+                )
+            ), False
         
-        return points[:3]  # 最多返回3个点
+        weights = ', '.join(str(w) for w in SearchIndex.RANK_WEIGHTS)
+        matches = text(
+            f"SELECT rowid AS id, bm25(article_fts, {weights}) AS rank "
+            "FROM article_fts WHERE article_fts MATCH :match"
+        ).bindparams(match=match).columns(id=db.Integer, rank=db.Float).subquery('fts')
+        query = query.join(matches, matches.c.id == Article.id)
+        return query.order_by(matches.c.rank, Article.published_date.desc()), True
+
+# 游标分页
+class KeysetPage:
+    """按 (published_date, id) 倒序的游标分页，翻页代价与深度无关，也不需要 COUNT(*)
+    
+    没有发布日期的文章排在最后，按 id 倒序分页。
+    """
+    def __init__(self, items, next_cursor, cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.has_next = next_cursor is not None
+        self.cursor = cursor
+    
+    @staticmethod
+    def encode_cursor(article):
+        date = article.published_date.isoformat() if article.published_date else ''
+        return f"{date}_{article.id}"
+    
+    @staticmethod
+    def decode_cursor(cursor):
+        """解析游标，返回 (published_date, id)，格式错误时返回 None"""
+        try:
+            date, article_id = cursor.rsplit('_', 1)
+            return (datetime.fromisoformat(date) if date else None), int(article_id)
+        except (ValueError, AttributeError):
+            return None
     
     @staticmethod
-    def _extract_problems_solutions(analyzed_sentences):
-        """提取问题与解决方案对"""
-        problems = []
-        solutions = []
+    def paginate(query, cursor=None, per_page=20):
+        position = KeysetPage.decode_cursor(cursor) if cursor else None
+        limit = per_page + 1  # 多取一条用于判断是否还有下一页
         
-        for sentence in analyzed_sentences:
-            if sentence['type'] == 'problem':
-                problems.append(ContentProcessor._simplify_to_chinese(sentence['text']))
-            elif sentence['type'] == 'implementation':
-                solutions.append(ContentProcessor._simplify_to_chinese(sentence['text']))
+        items = []
+        if position is None or position[0] is not None:
+            dated = query.filter(Article.published_date.isnot(None))
+            if position is not None:
+                dated = dated.filter(db.tuple_(Article.published_date, Article.id) < position)
+            items = dated.order_by(Article.published_date.desc(), Article.id.desc()).limit(limit).all()
         
-        # 组合问题和解决方案
-        combined = []
-        for i in range(min(len(problems), len(solutions))):
-            if problems[i] and solutions[i]:
-                combined.append(f"问题: {problems[i][:50]}... → 解决: {solutions[i][:50]}...")
+        if len(items) < limit:
+            undated = query.filter(Article.published_date.is_(None))
+            if position is not None and position[0] is None:
+                undated = undated.filter(Article.id < position[1])
+            items += undated.order_by(Article.id.desc()).limit(limit - len(items)).all()
         
-        return combined[:2]
+        next_cursor = None
+        if len(items) > per_page:
+            items = items[:per_page]
+            next_cursor = KeysetPage.encode_cursor(items[-1])
+        return KeysetPage(items, next_cursor, cursor)
+
+# 文章API
+class ArticleExport:
+    """/api/articles 的字段选择和序列化
+    
+    只从数据库读取请求的列；分页和导出都使用 KeysetPage 的 (published_date, id) 游标，
+    导出时逐块查询并逐行输出，内存占用与文章总数无关。
+    """
+    # 字段名 -> 需要加载的列
+    FIELDS = {
+        'id': (),
+        'title': (Article.title,),
+        'url': (Article.url,),
+        'author': (Article.author,),
+        'published_date': (),
+        'created_at': (Article.created_at,),
+        'source': (),
+        'category': (),
+        'tags': (Article.tags,),
+        'read_status': (Article.read_status,),
+        'description': (Article.description,),
+        'summary': (Article.summary,),
+        'content': (Article.content,)
+    }
+    # 不指定 fields 时返回除正文以外的字段
+    DEFAULT_FIELDS = [name for name in FIELDS if name != 'content']
+    # 归档文章的字段 -> 需要加载的列；描述、摘要和正文都在压缩的 payload 中，请求了其中之一才读取和解压
+    ARCHIVED_FIELDS = {
+        'id': (),
+        'title': (ArchivedArticle.title,),
+        'url': (ArchivedArticle.url,),
+        'author': (ArchivedArticle.author,),
+        'published_date': (ArchivedArticle.published_date,),
+        'created_at': (ArchivedArticle.created_at,),
+        'source': (),
+        'category': (),
+        'tags': (ArchivedArticle.tags,),
+        'read_status': (ArchivedArticle.read_status,),
+        'description': (ArchivedArticle.payload,),
+        'summary': (ArchivedArticle.payload,),
+        'content': (ArchivedArticle.payload,)
+    }
     
     @staticmethod
-    def _simplify_to_chinese(text):
-        """将英文技术句子简化并中文化"""
-        if not text:
-            return ""
-        
-        # 常见技术术语的中文替换
-        replacements = {
-            'Unreal Engine': 'Unreal引擎',
-            'Unity': 'Unity引擎',
-            'rendering': '渲染',
-            'performance': '性能',
-            'optimization': '优化',
-            'shader': '着色器',
-            'physics': '物理',
-            'animation': '动画',
-            'AI': '人工智能',
-            'VR': '虚拟现实',
-            'AR': '增强现实',
-            'GPU': '图形处理器',
-            'CPU': '处理器',
-            'framework': '框架',
-            'algorithm': '算法',
-            'gameplay': '游戏玩法'
-        }
-        
-        # 应用替换
-        result = text
-        for eng, cn in replacements.items():
-            result = re.sub(r'\b' + re.escape(eng) + r'\b', cn, result, flags=re.IGNORECASE)
+    def parse_fields(value):
+        """解析逗号分隔的字段列表，包含未知字段时抛出 ValueError"""
+        if not value:
+            return ArticleExport.DEFAULT_FIELDS
+        fields = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in fields if name not in ArticleExport.FIELDS]
+        if unknown or not fields:
+            raise ValueError(f"未知字段: {', '.join(unknown)}，可选字段: {', '.join(ArticleExport.FIELDS)}")
+        return fields
+    
+    @staticmethod
+    def query(fields, category='', search=''):
+        columns = [Article.published_date]  # 游标需要发布时间
+        for name in fields:
+            columns.extend(ArticleExport.FIELDS[name])
+        query = Article.query.join(Article.source).options(
+            load_only(*columns), contains_eager(Article.source).load_only(RSSSource.name, RSSSource.category)
+        )
+        if category:
+            query = query.filter(RSSSource.category == category)
+        if search:
+            # 按游标分页时不使用相关性排序
+            query = SearchIndex.filter(query, search)[0].order_by(None)
+        return query
+    
+    @staticmethod
+    def archived_query(fields, category='', search=''):
+        """导出归档文章的查询，搜索与首页一样只匹配归档文章的标题"""
+        columns = [ArchivedArticle.id]
+        for name in fields:
+            columns.extend(ArticleExport.ARCHIVED_FIELDS[name])
+        query = ArchivedArticle.query.join(ArchivedArticle.source).options(
+            load_only(*dict.fromkeys(columns)),
+            contains_eager(ArchivedArticle.source).load_only(RSSSource.name, RSSSource.category)
+        )
+        if category:
+            query = query.filter(RSSSource.category == category)
+        if search:
+            query = query.filter(ArchivedArticle.title.contains(search))
+        return query
+    
+    @staticmethod
+    def serialize(article, fields, pending_read=()):
+        item = {}
+        for name in fields:
+            if name == 'source':
+                item[name] = article.source.name
+            elif name == 'category':
+                item[name] = article.source.category
+            elif name == 'tags':
+                item[name] = [tag for tag in (article.tags or '').split(',') if tag]
+            elif name == 'read_status':
+                item[name] = bool(article.read_status) or article.id in pending_read
+            elif name in ('published_date', 'created_at'):
+                value = getattr(article, name)
+                item[name] = value.isoformat() if value else None
+            else:
+                item[name] = getattr(article, name)
+        return item
+    
+    @staticmethod
+    def iter_ndjson(query, fields, archived_query=None):
+        """逐块查询全部匹配的文章，每篇输出一行JSON
         
-        # 移除过长的技术细节
-        if len(result) > 100:
-            # 尝试提取主要信息
-            sentences = re.split(r'[.。]', result)
-            if sentences:
-                result = sentences[0] + "。"
+        指定 archived_query 时在文章表之后按ID顺序导出归档文章。
+        """
+        pending_read = ReadBuffer.pending_ids()
+        cursor = None
+        while True:
+            page = KeysetPage.paginate(query, cursor, app.config['API_EXPORT_CHUNK'])
+            lines = [json.dumps(ArticleExport.serialize(article, fields, pending_read), ensure_ascii=False) + '\n'
+                     for article in page.items]
+            # 结束读事务，导出较慢时不长时间占用WAL快照
+            db.session.rollback()
+            yield ''.join(lines)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
         
-        return result.strip()
+        if archived_query is None:
+            return
+        last_id = None
+        while True:
+            chunk = archived_query
+            if last_id is not None:
+                chunk = chunk.filter(ArchivedArticle.id > last_id)
+            articles = chunk.order_by(ArchivedArticle.id).limit(app.config['API_EXPORT_CHUNK']).all()
+            lines = [json.dumps(ArticleExport.serialize(article, fields), ensure_ascii=False) + '\n'
+                     for article in articles]
+            # 回滚后对象会过期，先记下最后一篇的ID
+            last_id = articles[-1].id if articles else None
+            db.session.rollback()
+            if lines:
+                yield ''.join(lines)
+            if len(articles) < app.config['API_EXPORT_CHUNK']:
+                break
 
-# RSS抓取功能
-class RSSFetcher:
+# 首页渲染缓存
+class PageCache:
+    """按 (页码, 游标, 分类, 搜索词) 缓存渲染好的首页HTML，LRU淘汰
+    
+    文章入库、已读状态变化、全文提取结果、归档和删除都会让首页内容变化，这些写操作调用 touch()，
+    事务提交后全局代数加一并清空缓存。渲染前记下代数，写入缓存时带上，
+    渲染期间有新的提交时这份结果不会被之后的请求命中。
+    代数在进程内，其他进程（如命令行工具）的写入只能等 PAGE_CACHE_TTL 过期。
+    """
+    generation = 0
+    _entries = OrderedDict()  # (代数, 键) -> (HTML, 写入时间)
+    _lock = threading.Lock()
+    
     @staticmethod
-    def fetch_articles(source):
-        try:
-            logger.info(f"正在抓取RSS源: {source.name}")
-            
-            # 设置超时时间
-            import socket
-            socket.setdefaulttimeout(30)  # 30秒超时
-            
-            feed = feedparser.parse(source.url)
-            
-            if feed.bozo:
-                logger.warning(f"RSS源可能有问题: {source.name} - {feed.bozo_exception}")
-            
-            if not hasattr(feed, 'entries') or not feed.entries:
-                logger.warning(f"RSS源没有文章: {source.name}")
-                return 0
-            
-            logger.info(f"RSS源 {source.name} 找到 {len(feed.entries)} 篇文章")
-            
-            new_articles = 0
-            # 限制每次处理的文章数量，避免超时
-            max_articles = 10
-            
-            for i, entry in enumerate(feed.entries[:max_articles]):
-                try:
-                    logger.info(f"正在检查文章: {entry.title[:50]}... (URL: {entry.link})")
-                    
-                    # 检查文章是否已存在
-                    existing = Article.query.filter_by(url=entry.link).first()
-                    if existing:
-                        logger.info(f"文章已存在，跳过: {entry.title[:50]}...")
-                        continue
-                    
-                    logger.info(f"文章不存在，开始处理: {entry.title[:50]}...")
-                    
-                    # 解析发布日期
-                    published_date = None
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        try:
-                            published_date = datetime(*entry.published_parsed[:6])
-                        except (ValueError, TypeError):
-                            pass
-                    elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                        try:
-                            published_date = datetime(*entry.updated_parsed[:6])
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    # 提取描述
-                    description = ""
-                    if hasattr(entry, 'summary'):
-                        description = entry.summary
-                    elif hasattr(entry, 'description'):
-                        description = entry.description
-                    
-                    # 清理HTML标签
-                    if description:
-                        soup = BeautifulSoup(description, 'html.parser')
-                        description = soup.get_text()[:500]
-                    
-                    # 提取标签
-                    tags = []
-                    if hasattr(entry, 'tags'):
-                        tags = [tag.term for tag in entry.tags]
-                    
-                    # 提取文章内容并生成摘要（简化处理，避免超时）
-                    logger.info(f"正在处理文章 {i+1}/{min(len(feed.entries), max_articles)}: {entry.title[:50]}...")
-                    
-                    # 简化内容提取，避免超时
-                    article_content = ""
-                    article_summary = ContentProcessor.generate_summary(
-                        entry.title, 
-                        description, 
-                        ""  # 暂时不提取完整内容，避免超时
-                    )
-                    
-                    # 创建新文章
-                    article = Article(
-                        title=entry.title[:500],  # 限制标题长度
-                        url=entry.link,
-                        description=description,
-                        content=article_content,
-                        summary=article_summary,
-                        author=getattr(entry, 'author', '')[:100],  # 限制作者长度
-                        published_date=published_date,
-                        source_id=source.id,
-                        tags=','.join(tags)[:500]  # 限制标签长度
-                    )
-                    
-                    db.session.add(article)
-                    new_articles += 1
-                    logger.info(f"成功添加文章: {entry.title[:50]}...")
-                    
-                except Exception as e:
-                    logger.warning(f"处理文章时出错: {str(e)}")
-                    continue
-            
-            # 更新源的最后更新时间
-            source.last_updated = datetime.utcnow()
-            db.session.commit()
-            
-            logger.info(f"从 {source.name} 抓取了 {new_articles} 篇新文章")
-            return new_articles
-            
-        except Exception as e:
-            logger.error(f"抓取RSS源 {source.name} 时出错: {str(e)}")
-            db.session.rollback()  # 回滚事务
-            return 0
+    def touch():
+        """标记当前事务修改了首页内容，提交后使缓存失效"""
+        db.session.info['page_cache_dirty'] = True
     
     @staticmethod
-    def fetch_all_sources():
-        """抓取所有RSS源的文章"""
-        try:
-            logger.info("开始抓取所有RSS源")
-            sources = RSSSource.query.filter_by(active=True).all()
-            
-            logger.info(f"找到 {len(sources)} 个活跃的RSS源")
-            
-            if not sources:
-                logger.warning("没有找到活跃的RSS源")
-                return 0
-            
-            total_new_articles = 0
-            successful_sources = 0
-            failed_sources = 0
-            
-            for i, source in enumerate(sources):
-                try:
-                    logger.info(f"正在处理RSS源 {i+1}/{len(sources)}: {source.name} (URL: {source.url})")
-                    new_articles = RSSFetcher.fetch_articles(source)
-                    total_new_articles += new_articles
-                    successful_sources += 1
-                    logger.info(f"RSS源 {source.name} 完成，新增 {new_articles} 篇文章")
-                    
-                except Exception as e:
-                    failed_sources += 1
-                    logger.error(f"处理RSS源 {source.name} 时出错: {str(e)}")
-                    continue
-            
-            logger.info(f"RSS抓取完成！成功: {successful_sources}, 失败: {failed_sources}, 总新增文章: {total_new_articles}")
-            return total_new_articles
-            
-        except Exception as e:
-            logger.error(f"抓取所有RSS源时出错: {str(e)}")
-            return 0
+    def bump():
+        with PageCache._lock:
+            PageCache.generation += 1
+            PageCache._entries.clear()
+    
+    @staticmethod
+    def get(key):
+        if not app.config['PAGE_CACHE_SIZE']:
+            return None
+        with PageCache._lock:
+            entry_key = (PageCache.generation, key)
+            entry = PageCache._entries.get(entry_key)
+            if entry is not None and time.monotonic() - entry[1] > app.config['PAGE_CACHE_TTL']:
+                del PageCache._entries[entry_key]
+                entry = None
+            if entry is not None:
+                PageCache._entries.move_to_end(entry_key)
+        METRICS.inc('page_cache_requests_total', result='hit' if entry is not None else 'miss')
+        return entry[0] if entry is not None else None
+    
+    @staticmethod
+    def put(key, generation, html):
+        size = app.config['PAGE_CACHE_SIZE']
+        if not size:
+            return
+        with PageCache._lock:
+            if generation != PageCache.generation:
+                # 渲染期间内容已经变化
+                return
+            PageCache._entries[(generation, key)] = (html, time.monotonic())
+            PageCache._entries.move_to_end((generation, key))
+            while len(PageCache._entries) > size:
+                PageCache._entries.popitem(last=False)
+    
+    @staticmethod
+    def stats():
+        with PageCache._lock:
+            return {'generation': PageCache.generation, 'entries': len(PageCache._entries)}
+
+@event.listens_for(db.session, 'after_commit')
+def invalidate_page_cache(session):
+    if session.info.pop('page_cache_dirty', False):
+        PageCache.bump()
+
+@event.listens_for(db.session, 'after_rollback')
+def keep_page_cache(session):
+    session.info.pop('page_cache_dirty', None)
+
+METRICS.counter('page_cache_requests_total', '首页渲染缓存的命中和未命中次数', ('result',))
+METRICS.gauge('page_cache_entries', '首页渲染缓存中的条目数', (), lambda: {(): PageCache.stats()['entries']})
 
 # 路由
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        endpoint = request.endpoint or 'unmatched'
+        METRICS.observe('http_request_duration_seconds', time.perf_counter() - started,
+                        endpoint=endpoint, method=request.method)
+        METRICS.inc('http_requests_total', endpoint=endpoint, method=request.method, status=response.status_code)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus 文本格式的运行指标"""
+    return Response(METRICS.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/')
 def index():
     page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor', '')
     category = request.args.get('category', '')
     search = request.args.get('search', '')
+    per_page = app.config['ARTICLES_PER_PAGE']
     
-    query = Article.query
+    # 内容没有变化时直接返回上次渲染的结果
+    cache_key = (request.args.get('page'), cursor, category, search)
+    html = PageCache.get(cache_key)
+    if html is not None:
+        return html
+    generation = PageCache.generation
+    
+    # 在同一条查询中加载RSS源，避免渲染时逐篇查询 article.source
+    query = Article.query.join(Article.source).options(contains_eager(Article.source))
     
     if category:
-        source_ids = [s.id for s in RSSSource.query.filter_by(category=category).all()]
-        query = query.filter(Article.source_id.in_(source_ids))
+        query = query.filter(RSSSource.category == category)
     
+    ranked = False
     if search:
-        query = query.filter(
-            db.or_(
-                Article.title.contains(search),
-                Article.description.contains(search),
-                Article.tags.contains(search)
-            )
+        query, ranked = SearchIndex.filter(query, search)
+    
+    # 搜索结果按相关性排序并使用页码分页；显式指定 page 参数时也使用页码分页
+    if app.config['ARTICLE_PAGINATION'] == 'cursor' and not ranked and 'page' not in request.args:
+        pagination = 'cursor'
+        articles = KeysetPage.paginate(query, cursor, per_page)
+    else:
+        pagination = 'page'
+        if not ranked:
+            query = query.order_by(Article.published_date.desc(), Article.id.desc())
+        articles = query.paginate(
+            page=page, per_page=per_page, error_out=False
         )
     
-    articles = query.order_by(Article.published_date.desc()).paginate(
-        page=page, per_page=20, error_out=False
-    )
+    # 搜索第一页同时列出标题匹配的归档文章
+    archived = []
+    if search and not cursor and page == 1:
+        archived = ArticleArchive.search(search, category)
     
     # 获取分类统计
-    categories = db.session.query(RSSSource.category, db.func.count(Article.id)).join(Article).group_by(RSSSource.category).all()
+    categories = CategoryStat.sidebar()
+    
+    html = render_template('index.html', articles=articles, pagination=pagination, categories=categories, current_category=category, search=search,
+                           pending_read=ReadBuffer.pending_ids(), archived=archived)
+    PageCache.put(cache_key, generation, html)
+    return html
+
+@app.route('/api/articles')
+def api_articles():
+    """文章列表API
+    
+    参数：category、search 与首页相同；cursor 为上一页返回的 next_cursor；limit 为每页数量；
+    fields 为逗号分隔的字段列表；format=ndjson 时忽略 cursor 和 limit，流式导出全部匹配的文章，
+    同时指定 include_archived=1 时在最后导出匹配的归档文章。
+    """
+    try:
+        fields = ArticleExport.parse_fields(request.args.get('fields', ''))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    category = request.args.get('category', '')
+    search = request.args.get('search', '')
+    query = ArticleExport.query(fields, category, search)
     
-    return render_template('index.html', articles=articles, categories=categories, current_category=category, search=search)
+    if request.args.get('format') == 'ndjson':
+        archived_query = None
+        if request.args.get('include_archived') in ('1', 'true', 'on'):
+            archived_query = ArticleExport.archived_query(fields, category, search)
+        return Response(stream_with_context(ArticleExport.iter_ndjson(query, fields, archived_query)),
+                        content_type='application/x-ndjson; charset=utf-8')
+    
+    cursor = request.args.get('cursor', '')
+    if cursor and KeysetPage.decode_cursor(cursor) is None:
+        return jsonify({'success': False, 'message': 'cursor 格式错误'}), 400
+    limit = request.args.get('limit', app.config['ARTICLES_PER_PAGE'], type=int)
+    limit = max(1, min(limit, app.config['API_MAX_LIMIT']))
+    
+    page = KeysetPage.paginate(query, cursor, limit)
+    pending_read = ReadBuffer.pending_ids()
+    return jsonify({
+        'articles': [ArticleExport.serialize(article, fields, pending_read) for article in page.items],
+        'next_cursor': page.next_cursor
+    })
 
 @app.route('/sources')
 def sources():
     sources = RSSSource.query.all()
-    return render_template('sources.html', sources=sources)
+    # 一次分组查询统计各源的文章数，不再为每个源加载全部文章
+    article_counts = dict(
+        db.session.query(Article.source_id, db.func.count(Article.id)).group_by(Article.source_id).all()
+    )
+    return render_template('sources.html', sources=sources, article_counts=article_counts)
 
 @app.route('/add_source', methods=['POST'])
 def add_source():
@@ -561,20 +3510,96 @@ def add_source():
     db.session.add(source)
     db.session.commit()
     
-    # 立即抓取一次
-    RSSFetcher.fetch_articles(source)
+    # 首次抓取在后台进行，不阻塞请求
+    RSSFetcher.queue_due_sources()
     
     return redirect(url_for('sources'))
 
+@app.route('/sources/export')
+def export_sources():
+    """导出OPML格式的RSS源列表"""
+    return Response(OPMLSources.export(RSSSource.query.all()), content_type='text/x-opml; charset=utf-8',
+                    headers={'Content-Disposition': 'attachment; filename=sources.opml'})
+
+@app.route('/sources/import', methods=['POST'])
+def import_sources():
+    """导入OPML文件（表单字段 opml，或直接作为请求体）
+    
+    新的RSS源以停用状态加入后立即返回，后台任务检查能否访问并启用能访问的源，
+    include_unreachable=1 时全部启用；已存在的URL跳过。检查进度通过抓取任务的接口查询。
+    """
+    upload = request.files.get('opml')
+    data = upload.read() if upload else request.get_data()
+    if not data:
+        return jsonify({'success': False, 'message': '请上传OPML文件'}), 400
+    try:
+        entries = OPMLSources.parse(data)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    # 跳过已存在的和文件中重复的URL
+    existing = {url for (url,) in db.session.query(RSSSource.url)}
+    new_entries = []
+    for entry in entries:
+        if entry['url'] in existing:
+            continue
+        existing.add(entry['url'])
+        new_entries.append(entry)
+    
+    include_unreachable = request.values.get('include_unreachable') in ('1', 'true', 'on')
+    sources = [RSSSource(name=entry['name'], url=entry['url'], category=entry['category'], active=False)
+               for entry in new_entries]
+    db.session.add_all(sources)
+    db.session.commit()
+    
+    logger.info(f"导入OPML：{len(entries)} 个源，新增 {len(sources)} 个，在后台检查")
+    response = {
+        'success': True,
+        'total': len(entries),
+        'added': len(sources),
+        'skipped_existing': len(entries) - len(new_entries),
+        'job_id': None
+    }
+    if not sources:
+        return jsonify(response)
+    
+    source_ids = [source.id for source in sources]
+    job, _ = FetchJobs.start('opml', lambda progress: OPMLSources.check_imported(source_ids, include_unreachable, progress))
+    response.update({
+        'job_id': job['id'],
+        'status_url': url_for('fetch_job_status', job_id=job['id']),
+        'events_url': url_for('fetch_job_events', job_id=job['id'])
+    })
+    return jsonify(response), 202
+
 @app.route('/delete_source/<int:source_id>', methods=['POST'])
 def delete_source(source_id):
     source = RSSSource.query.get_or_404(source_id)
     
+    # 从分类计数中扣除该源的文章
+    total, unread = db.session.query(
+        db.func.count(Article.id),
+        db.func.sum(db.case((Article.read_status.is_(True), 0), else_=1))
+    ).filter(Article.source_id == source_id).one()
+    CategoryStat.apply(source.category, articles=-total, unread=-(unread or 0))
+    
     # 删除相关文章
+    article_ids = db.session.query(Article.id).filter(Article.source_id == source_id)
+    archived_ids = db.session.query(ArchivedArticle.id).filter(ArchivedArticle.source_id == source_id)
+    ExtractionJob.query.filter(ExtractionJob.article_id.in_(article_ids.scalar_subquery())).delete(synchronize_session=False)
+    ArticleFingerprint.query.filter(ArticleFingerprint.article_id.in_(article_ids.scalar_subquery())).delete(synchronize_session=False)
+    # 其他源合并到这些文章的重复文章也删除，下次抓取时作为独立文章重新入库
+    ArticleAlternate.query.filter(db.or_(
+        ArticleAlternate.source_id == source_id,
+        ArticleAlternate.article_id.in_(article_ids.scalar_subquery()),
+        ArticleAlternate.article_id.in_(archived_ids.scalar_subquery())
+    )).delete(synchronize_session=False)
     Article.query.filter_by(source_id=source_id).delete()
+    ArchivedArticle.query.filter_by(source_id=source_id).delete()
     
     # 删除RSS源
     db.session.delete(source)
+    PageCache.touch()
     db.session.commit()
     
     return redirect(url_for('sources'))
@@ -588,97 +3613,122 @@ def toggle_source(source_id):
 
 @app.route('/fetch_now', methods=['GET', 'POST'])
 def fetch_now():
-    try:
-        print("=" * 50)
-        print("🚀 手动抓取RSS源请求已接收！")
-        print("=" * 50)
-        logger.info("🚀 开始手动抓取RSS源")
-        
-        # 设置更严格的超时控制
-        import signal
-        import threading
-        
-        def timeout_handler():
-            logger.error("RSS抓取超时")
-            return None
-        
-        # 使用线程来执行抓取，避免阻塞主线程
-        result = {'new_articles': 0, 'error': None}
-        
-        def fetch_worker():
-            try:
-                print("📡 开始执行抓取工作线程")
-                # 在线程中创建应用上下文
-                with app.app_context():
-                    result['new_articles'] = RSSFetcher.fetch_all_sources()
-                print(f"✅ 抓取工作线程完成，获得 {result['new_articles']} 篇新文章")
-            except Exception as e:
-                result['error'] = str(e)
-                print(f"❌ 抓取线程出错: {str(e)}")
-                logger.error(f"抓取线程出错: {str(e)}")
-        
-        # 创建并启动抓取线程
-        fetch_thread = threading.Thread(target=fetch_worker)
-        fetch_thread.daemon = True
-        fetch_thread.start()
-        print("🔄 抓取线程已启动，等待完成...")
-        
-        # 等待最多60秒
-        fetch_thread.join(timeout=60)
-        
-        if fetch_thread.is_alive():
-            print("⏰ RSS抓取超时（60秒）")
-            logger.error("RSS抓取超时（60秒）")
-            return jsonify({
-                'success': False, 
-                'message': '抓取超时，请稍后再试'
-            }), 408
-        
-        if result['error']:
-            print(f"❌ RSS抓取出错: {result['error']}")
-            logger.error(f"RSS抓取出错: {result['error']}")
-            return jsonify({
-                'success': False, 
-                'message': f'抓取失败: {result["error"]}'
-            }), 500
-        
-        new_articles = result['new_articles']
-        print(f"🎉 手动抓取完成，获得 {new_articles} 篇新文章")
-        logger.info(f"手动抓取完成，获得 {new_articles} 篇新文章")
-        return jsonify({
-            'success': True, 
-            'message': f'抓取完成，获得 {new_articles} 篇新文章'
-        })
-        
-    except Exception as e:
-        print(f"💥 手动抓取RSS源时出错: {str(e)}")
-        logger.error(f"手动抓取RSS源时出错: {str(e)}")
-        return jsonify({
-            'success': False, 
-            'message': f'抓取失败: {str(e)}'
-        }), 500
+    """启动（或加入正在运行的）抓取任务，立即返回任务ID"""
+    job, created = FetchJobs.start()
+    if created:
+        logger.info(f"🚀 开始手动抓取RSS源，任务 {job['id']}")
+        message = '已开始抓取RSS源'
+    else:
+        message = '已有抓取任务在运行'
+    return jsonify({
+        'success': True,
+        'message': message,
+        'job_id': job['id'],
+        'created': created,
+        'status_url': url_for('fetch_job_status', job_id=job['id']),
+        'events_url': url_for('fetch_job_events', job_id=job['id'])
+    }), 202
+
+@app.route('/fetch_jobs/<job_id>')
+def fetch_job_status(job_id):
+    job = FetchJobs.jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': '任务不存在'}), 404
+    return jsonify(FetchJobs.snapshot(job))
+
+@app.route('/fetch_jobs/<job_id>/events')
+def fetch_job_events(job_id):
+    """以 server-sent events 推送抓取进度，断线重连时从 Last-Event-ID 之后继续"""
+    job = FetchJobs.jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': '任务不存在'}), 404
+    
+    last_id = request.headers.get('Last-Event-ID', request.args.get('after', ''))
+    after = int(last_id) if last_id.isdigit() else -1
+    
+    def stream():
+        for event in FetchJobs.events(job, after):
+            if event is None:
+                yield ': keepalive\n\n'
+            else:
+                yield f"id: {event['id']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+    
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 @app.route('/article/<int:article_id>')
 def article_detail(article_id):
-    article = Article.query.get_or_404(article_id)
+    article = Article.query.options(joinedload(Article.source)).filter_by(id=article_id).first()
+    if article is None:
+        # 已归档的文章只读展示
+        archived = ArticleArchive.get(article_id)
+        if archived is None:
+            abort(404)
+        return render_template('article.html', article=archived, archived=True,
+                               alternates=NearDuplicates.alternates(article_id))
     
-    # 标记为已读
-    article.read_status = True
-    db.session.commit()
+    # 先渲染再提交，避免提交后对象过期导致重新加载文章和RSS源
+    html = render_template('article.html', article=article, alternates=NearDuplicates.alternates(article_id))
     
-    return render_template('article.html', article=article)
+    # 标记为已读，由缓冲区稍后写入
+    mark_article_read(article)
+    
+    return html
 
 @app.route('/mark_read/<int:article_id>', methods=['POST'])
 def mark_read(article_id):
-    article = Article.query.get_or_404(article_id)
-    article.read_status = True
-    db.session.commit()
+    article = Article.query.options(joinedload(Article.source)).filter_by(id=article_id).first_or_404()
+    mark_article_read(article)
     return jsonify({'success': True})
 
+@app.route('/api/mark_read', methods=['POST'])
+def bulk_mark_read():
+    """批量标记已读
+    
+    请求体为JSON：{"ids": [1, 2, 3]}，或者按条件 {"category": "unity", "before": "2024-01-01T00:00:00"}，
+    两种条件可以组合，至少需要一个。before 按发布时间（没有发布时间时按入库时间）过滤。
+    """
+    payload = request.get_json(silent=True) or {}
+    conditions = []
+    
+    ids = payload.get('ids')
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(article_id, int) for article_id in ids):
+            return jsonify({'success': False, 'message': 'ids 必须是整数列表'}), 400
+        conditions.append(Article.id.in_(ids))
+    
+    category = payload.get('category')
+    if category:
+        conditions.append(Article.source_id.in_(db.select(RSSSource.id).where(RSSSource.category == category)))
+    
+    before = payload.get('before')
+    if before:
+        try:
+            before = datetime.fromisoformat(before)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'before 必须是ISO格式的时间'}), 400
+        if before.tzinfo is not None:
+            before = before.astimezone(timezone.utc).replace(tzinfo=None)
+        conditions.append(db.func.coalesce(Article.published_date, Article.created_at) < before)
+    
+    if not conditions:
+        return jsonify({'success': False, 'message': '需要指定 ids、category 或 before'}), 400
+    
+    marked = IngestWriter.call(mark_read_where, *conditions)
+    return jsonify({'success': True, 'marked': marked})
+
 @app.route('/mark_all_read', methods=['POST'])
 def mark_all_read():
-    Article.query.update({'read_status': True})
-    db.session.commit()
+    def mark_all():
+        Article.query.filter(Article.read_status.isnot(True)).update({'read_status': True})
+        CategoryStat.query.update({'unread_count': 0})
+        PageCache.touch()
+    
+    # 缓冲中的文章已经包含在内
+    ReadBuffer.discard()
+    IngestWriter.call(mark_all)
     return jsonify({'success': True, 'message': '所有文章已标记为已读'})
 
 @app.route('/clear_data', methods=['POST'])
@@ -688,14 +3738,30 @@ def clear_data():
         logger.info("开始清除所有文章数据")
         
         # 删除所有文章
-        deleted_count = Article.query.count()
+        deleted_count = Article.query.count() + ArchivedArticle.query.count()
+        ReadBuffer.discard()
+        ExtractionJob.query.delete()
+        ArticleFingerprint.query.delete()
+        ArticleAlternate.query.delete()
         Article.query.delete()
+        ArchivedArticle.query.delete()
+        CategoryStat.query.delete()
+        PageCache.touch()
         
         # 重置所有RSS源的最后更新时间，并确保它们是活跃的
         sources = RSSSource.query.all()
         for source in sources:
             source.last_updated = None
             source.active = True  # 确保RSS源是活跃的
+            # 清除条件请求缓存，否则未变化的RSS源不会被重新抓取
+            source.etag = None
+            source.last_modified = None
+            source.content_hash = None
+            source.next_fetch_at = None
+            # 重置高水位，重新抓取时从最新的条目开始
+            source.high_water_guid = None
+            source.high_water_published = None
+            source.backfill_status = None
         
         db.session.commit()
         
@@ -725,15 +3791,39 @@ def debug_sources():
             'url': source.url,
             'active': source.active,
             'last_updated': source.last_updated.isoformat() if source.last_updated else None,
-            'category': source.category
+            'category': source.category,
+            'etag': source.etag,
+            'last_modified': source.last_modified,
+            'fetch_interval': source.fetch_interval,
+            'fetch_failures': source.fetch_failures,
+            'next_fetch_at': source.next_fetch_at.isoformat() if source.next_fetch_at else None,
+            'high_water_guid': source.high_water_guid,
+            'high_water_published': source.high_water_published.isoformat() if source.high_water_published else None,
+            'backfill_status': source.backfill_status
         })
     
     return jsonify({
         'total_sources': len(sources),
         'active_sources': len([s for s in sources if s.active]),
-        'sources': source_info
+        'sources': source_info,
+        'last_run': RSSFetcher.last_run
     })
 
+@app.route('/debug/extraction')
+def debug_extraction():
+    """调试路由：查看全文提取队列"""
+    return jsonify(ExtractionQueue.stats())
+
+@app.route('/debug/backfill')
+def debug_backfill():
+    """调试路由：查看历史文章回填状态"""
+    return jsonify(FeedBackfill.stats())
+
+@app.route('/debug/archive')
+def debug_archive():
+    """调试路由：查看归档表大小和最近一轮归档"""
+    return jsonify(ArticleArchive.stats())
+
 @app.route('/test', methods=['GET', 'POST'])
 def test_route():
     """测试路由：验证服务器响应"""
@@ -747,28 +3837,89 @@ def test_route():
         'method': request.method
     })
 
+# 为旧数据库补充新增的列
+def _ensure_columns(table, columns):
+    existing = {column['name'] for column in inspect(db.engine).get_columns(table)}
+    for name, ddl in columns:
+        if name not in existing:
+            logger.info(f"添加{name}列到{table}表")
+            db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+    db.session.commit()
+
+def _ensure_autoincrement(model, *id_columns):
+    """旧数据库中没有 AUTOINCREMENT 的表重建为 AUTOINCREMENT 表
+    
+    SQLite 不能给已有的表加 AUTOINCREMENT，只能按当前模型建新表、复制数据后替换旧表。
+    序列从表中和 id_columns（例如归档表的ID）中的最大值开始，这些ID不会再分配给新行。
+    旧表的索引和触发器随旧表删除，需要在之后重新创建。
+    """
+    table = model.__table__
+    sql = db.session.execute(
+        text("SELECT sql FROM sqlite_master WHERE type='table' AND name=:name"), {'name': table.name}
+    ).scalar()
+    if sql is None or 'AUTOINCREMENT' in sql.upper():
+        return
+    logger.info(f"重建{table.name}表以使用 AUTOINCREMENT")
+    rebuild = f'{table.name}_rebuild'
+    columns = ', '.join(column.name for column in table.columns)
+    create = str(CreateTable(table).compile(db.engine)).replace(
+        f'CREATE TABLE {table.name} (', f'CREATE TABLE {rebuild} (', 1
+    )
+    last_id = max(
+        (db.session.query(db.func.max(column)).scalar() or 0) for column in (table.c.id, *id_columns)
+    )
+    db.session.execute(text(f"DROP TABLE IF EXISTS {rebuild}"))
+    db.session.execute(text(create))
+    db.session.execute(text(f"INSERT INTO {rebuild} ({columns}) SELECT {columns} FROM {table.name}"))
+    db.session.execute(text(f"DROP TABLE {table.name}"))
+    db.session.execute(text(f"ALTER TABLE {rebuild} RENAME TO {table.name}"))
+    db.session.execute(text("DELETE FROM sqlite_sequence WHERE name = :name"), {'name': table.name})
+    db.session.execute(
+        text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"), {'name': table.name, 'seq': last_id}
+    )
+    db.session.commit()
+
 # 初始化数据库和默认RSS源
 def init_db():
     with app.app_context():
-        # 检查是否需要添加summary列
-        try:
-            db.session.execute(text("SELECT summary FROM article LIMIT 1"))
-        except Exception:
-            # summary列不存在，添加它
-            logger.info("添加summary列到article表")
-            db.session.execute(text("ALTER TABLE article ADD COLUMN summary TEXT"))
-            db.session.commit()
+        db.create_all()
         
-        # 检查是否需要添加content列
-        try:
-            db.session.execute(text("SELECT content FROM article LIMIT 1"))
-        except Exception:
-            # content列不存在，添加它
-            logger.info("添加content列到article表")
-            db.session.execute(text("ALTER TABLE article ADD COLUMN content TEXT"))
-            db.session.commit()
+        # 检查是否需要添加后来新增的列
+        _ensure_columns('article', [
+            ('summary', 'TEXT'),
+            ('content', 'TEXT')
+        ])
+        _ensure_columns('rss_source', [
+            ('etag', 'VARCHAR(200)'),
+            ('last_modified', 'VARCHAR(100)'),
+            ('content_hash', 'VARCHAR(64)'),
+            ('next_fetch_at', 'DATETIME'),
+            ('fetch_interval', 'INTEGER'),
+            ('fetch_failures', 'INTEGER DEFAULT 0'),
+            ('high_water_guid', 'VARCHAR(500)'),
+            ('high_water_published', 'DATETIME'),
+            ('backfill_status', 'VARCHAR(20)')
+        ])
+        _ensure_columns('article', [('url_hash', 'INTEGER'), ('summary_key', 'INTEGER')])
+        _ensure_columns('archived_article', [('url_hash', 'INTEGER')])
+        _ensure_columns('article_alternate', [('url_hash', 'INTEGER')])
+        # 旧数据库的文章表没有 AUTOINCREMENT，新文章可能拿到已归档文章的ID
+        _ensure_autoincrement(Article, ArchivedArticle.id)
         
-        db.create_all()
+        # 计算链接哈希并合并重复的文章，之后才能创建唯一索引
+        UrlKey.backfill()
+        
+        # 为旧数据库补充新增的索引
+        for model in (Article, ArchivedArticle, ArticleAlternate):
+            for index in model.__table__.indexes:
+                index.create(db.engine, checkfirst=True)
+        
+        # 全文搜索索引
+        SearchIndex.setup()
+        
+        # 首次升级时根据已有文章生成分类计数
+        if not CategoryStat.query.first() and Article.query.first():
+            CategoryStat.rebuild()
         
         # 添加专注于游戏开发技术的RSS源
         default_sources = [
@@ -916,15 +4067,121 @@ def init_db():
         
         db.session.commit()
 
+@app.cli.command('rebuild-counters')
+def rebuild_counters_command():
+    """从文章表重新统计分类计数"""
+    count = CategoryStat.rebuild()
+    print(f"已重新统计 {count} 个分类的文章数和未读数")
+
+@app.cli.command('fingerprint-articles')
+def fingerprint_articles_command():
+    """为还没有 SimHash 的文章计算指纹，已有的重复文章不会被合并"""
+    total = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(Article.id, Article.title, Article.description).outerjoin(
+            ArticleFingerprint, ArticleFingerprint.article_id == Article.id
+        ).filter(ArticleFingerprint.article_id.is_(None), Article.id > last_id).order_by(Article.id).limit(1000).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        fingerprints = [(article_id, NearDuplicates.simhash(title, description)) for article_id, title, description in rows]
+        fingerprints = [(article_id, simhash) for article_id, simhash in fingerprints if simhash is not None]
+        NearDuplicates.store(fingerprints)
+        db.session.commit()
+        total += len(fingerprints)
+    print(f"已为 {total} 篇文章计算指纹")
+
+@app.cli.command('resummarize')
+def resummarize_command():
+    """重新生成输入内容或摘要版本变化的文章摘要，没有变化的文章不会重新计算"""
+    def report(stats):
+        print(f"已检查 {stats['checked']}/{stats['total']} 篇，需要更新 {stats['stale']} 篇"
+              f"（缓存命中 {stats['cached']} 篇），已更新 {stats['updated']} 篇")
+    
+    stats = SummaryCache.resummarize(progress=report)
+    SummaryCache.evict()
+    print(f"完成：共检查 {stats['checked']} 篇文章，更新了 {stats['updated']} 篇的摘要")
+
+@app.cli.command('backfill')
+def backfill_command():
+    """立即回填所有等待中的RSS源，之前失败的也重新尝试"""
+    RSSSource.query.filter_by(backfill_status='failed').update({'backfill_status': 'pending'})
+    db.session.commit()
+    total = {'sources': 0, 'failed': 0, 'new_articles': 0}
+    while True:
+        stats = FeedBackfill.run()
+        if not stats['sources']:
+            break
+        for key in total:
+            total[key] += stats[key]
+    print(f"已回填 {total['sources'] - total['failed']} 个RSS源，新增 {total['new_articles']} 篇文章，失败 {total['failed']} 个")
+
+@app.cli.command('archive')
+def archive_command():
+    """立即归档所有符合保留策略的文章"""
+    total = 0
+    while True:
+        stats = ArticleArchive.compact()
+        total += stats['archived']
+        if stats['finished'] or not stats['archived']:
+            break
+    evicted = SummaryCache.evict()
+    print(f"已归档 {total} 篇文章，淘汰了 {evicted} 条摘要缓存")
+
 # 定时任务
+def with_app_context(func):
+    """定时任务在后台线程中运行，需要自己推入应用上下文"""
+    def wrapper():
+        with app.app_context():
+            return func()
+    return wrapper
+
 def start_scheduler():
     scheduler = BackgroundScheduler()
+    # 每个RSS源有自己的下次抓取时间，调度器只负责定时分派到期的源
     scheduler.add_job(
-        func=RSSFetcher.fetch_all_sources,
+        func=with_app_context(RSSFetcher.fetch_due_sources),
         trigger="interval",
-        hours=2,  # 每2小时抓取一次
-        id='fetch_rss'
+        seconds=app.config['FETCH_CHECK_SECONDS'],
+        id='fetch_rss',
+        max_instances=1,
+        coalesce=True
     )
+    if app.config['EXTRACTION_ENABLED']:
+        scheduler.add_job(
+            func=with_app_context(ExtractionQueue.process_batch),
+            trigger="interval",
+            seconds=30,
+            id='extract_content'
+        )
+    if app.config['SUMMARY_CACHE_SIZE']:
+        scheduler.add_job(
+            func=with_app_context(SummaryCache.evict),
+            trigger="interval",
+            seconds=app.config['SUMMARY_CACHE_EVICT_SECONDS'],
+            id='evict_summary_cache',
+            max_instances=1,
+            coalesce=True
+        )
+    if app.config['ARCHIVE_ENABLED']:
+        scheduler.add_job(
+            func=with_app_context(ArticleArchive.compact),
+            trigger="interval",
+            seconds=app.config['ARCHIVE_CHECK_SECONDS'],
+            id='archive_articles',
+            max_instances=1,
+            coalesce=True
+        )
+    if app.config['BACKFILL_ENABLED']:
+        scheduler.add_job(
+            func=with_app_context(FeedBackfill.run),
+            trigger="interval",
+            seconds=app.config['BACKFILL_CHECK_SECONDS'],
+            id='backfill_sources',
+            max_instances=1,
+            coalesce=True
+        )
     scheduler.start()
 
 if __name__ == '__main__':
@@ -0,0 +1,6 @@
+"""RSS抓取和摘要生成的基准测试
+
+在仓库根目录运行：
+
+    python -m benchmarks.run --output bench.json
+"""
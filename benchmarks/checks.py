@@ -0,0 +1,149 @@
+"""行为检查：不计时，只验证容易回归的行为，任何一项失败时以非零状态退出
+
+    python -m benchmarks.checks
+
+数据库使用临时文件，不会影响 rss_feeds.db。
+"""
+import logging
+import os
+import re
+import sys
+import tempfile
+import traceback
+
+from . import feeds
+from .run import load_app
+
+
+def check_job_events_after_done(rss_app):
+    """从 done 事件或之后的位置重连时，事件流立即结束而不是一直发送心跳"""
+    jobs = rss_app.FetchJobs
+    job, _ = jobs.start('check', lambda progress: progress({'type': 'start', 'total': 0}))
+    events = list(jobs.events(job, keepalive=5))
+    assert events and events[-1]['type'] == 'done', events
+    done_id = events[-1]['id']
+    for after in (done_id, done_id + 5):
+        # 修复之前这里会在等待 keepalive 秒后产出心跳 None，而不是结束
+        first = next(jobs.events(job, after=after, keepalive=0.1), 'end')
+        assert first == 'end', first
+
+    client = rss_app.app.test_client()
+    response = client.get(f"/fetch_jobs/{job['id']}/events", headers={'Last-Event-ID': str(done_id)})
+    assert response.status_code == 200 and response.get_data(as_text=True) == '', response.get_data(as_text=True)
+
+
+def check_keyword_matcher(rss_app):
+    """关键词匹配与逐个检查 keyword in sentence 一致，关键词可以含数字、空格、符号，中文关键词可以互相重叠"""
+    tech_categories = {area: list(keywords) for area, keywords in rss_app.TECH_CATEGORIES.items()}
+    tech_categories['渲染技术'] += ['ue5', 'dx12', 'ray tracing', 'level-of-detail', '光线追踪', '追踪']
+    tech_categories['游戏引擎'] += ['c++', 'unreal engine 5']
+    impl_keywords = rss_app.IMPLEMENTATION_KEYWORDS + ['渲染管线']
+    tables = (tech_categories, impl_keywords, rss_app.PROBLEM_KEYWORDS,
+              rss_app.RESULT_KEYWORDS, rss_app.ARGUMENT_KEYWORDS)
+    matcher = rss_app.KeywordMatcher(*tables)
+
+    def expected(sentence):
+        sentence_lower = sentence.lower()
+        pairs = [(area, keyword) for area, keywords in tech_categories.items()
+                 for keyword in keywords if keyword in sentence_lower]
+        score = 2 * len(pairs)
+        sentence_type = 'general'
+        for (name, bonus), keywords in zip(matcher.SENTENCE_TYPES, tables[1:]):
+            if any(keyword in sentence_lower for keyword in keywords):
+                sentence_type = name
+                score += bonus
+                break
+        if re.search(r'\d+%|\d+倍|\d+x', sentence):
+            score += 1
+        if 30 < len(sentence) < 150:
+            score += 1
+        return (sentence, tuple(area for area, keyword in pairs), tuple(keyword for area, keyword in pairs),
+                sentence_type, score)
+
+    sentences = [
+        'Ray tracing in UE5 with DX12 and C++ is 3x faster',
+        'Unreal Engine 5 adds level-of-detail streaming for large worlds',
+        '新的光线追踪渲染管线提升了性能',
+        '路径追踪不是光线追踪',
+    ]
+    for entry in feeds.make_entries('check', 200, seed=1, cjk_ratio=0.5):
+        sentences += [sentence for sentence in re.split(r'[.!?。！？]\s*', entry['description']) if sentence]
+    for sentence in sentences:
+        result = tuple(matcher.analyze(sentence))
+        assert result == expected(sentence), (sentence, result, expected(sentence))
+
+
+def check_url_canonical(rss_app):
+    """链接规范化只去掉已知的跟踪参数，有实际含义的查询参数保留"""
+    url_key = rss_app.UrlKey
+    same = [
+        ('https://example.com/post?utm_source=rss&utm_medium=feed', 'http://EXAMPLE.com/post/'),
+        ('https://example.com/post?fbclid=abc&id=3&gclid=x', 'https://example.com/post?id=3'),
+        ('https://example.com/post?b=2&a=1#comments', 'https://example.com:443/post?a=1&b=2'),
+        ('https://example.com/post?mc_cid=1&mc_eid=2&ref_src=twsrc', 'https://example.com/post'),
+    ]
+    different = [
+        ('https://github.com/org/repo/blob/main/README.md?ref=v1.0', 'https://github.com/org/repo/blob/main/README.md?ref=v2.0'),
+        ('https://example.com/docs?ref=main', 'https://example.com/docs'),
+        ('https://example.com/view?id=1', 'https://example.com/view?id=2'),
+        ('https://example.com/list?page=2', 'https://example.com/list'),
+        ('https://example.com/search?tag=gpu', 'https://example.com/search?tag=cpu'),
+    ]
+    for first, second in same:
+        assert url_key.hash(first) == url_key.hash(second), (first, second)
+    for first, second in different:
+        assert url_key.hash(first) != url_key.hash(second), (first, second)
+    assert url_key.clean('https://example.com/docs?ref=main&utm_source=rss#top') == 'https://example.com/docs?ref=main'
+
+
+def check_read_buffer_keeps_page_cache(rss_app):
+    """浏览文章只把已读状态放入缓冲区，首页缓存在写入提交后才失效"""
+    db = rss_app.db
+    source = rss_app.RSSSource(name='check', url='https://check.example.com/feed', category='check')
+    db.session.add(source)
+    db.session.flush()
+    article = rss_app.Article(title='check', url='https://check.example.com/read', source_id=source.id)
+    db.session.add(article)
+    db.session.commit()
+
+    client = rss_app.app.test_client()
+    client.get('/?category=check')
+    generation = rss_app.PageCache.generation
+    rss_app.mark_article_read(article)
+    assert article.id in rss_app.ReadBuffer.pending_ids()
+    assert rss_app.PageCache.generation == generation, '加入缓冲区时首页缓存不应失效'
+    assert rss_app.ReadBuffer.flush(direct=True) == 1
+    assert rss_app.PageCache.generation > generation, '写入提交后首页缓存应当失效'
+    # direct 写入使用单独的会话，检查所在会话里的文章对象需要重新加载
+    db.session.expire_all()
+    assert 'opacity-75' in client.get('/?category=check').get_data(as_text=True)
+
+
+CHECKS = [
+    check_job_events_after_done,
+    check_keyword_matcher,
+    check_url_canonical,
+    check_read_buffer_keeps_page_cache,
+]
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    failed = 0
+    with tempfile.TemporaryDirectory(prefix='rss-check-') as workdir:
+        rss_app = load_app(os.path.join(workdir, 'check.db'))
+        with rss_app.app.app_context():
+            for check in CHECKS:
+                try:
+                    check(rss_app)
+                    print(f"ok    {check.__name__}")
+                except Exception:
+                    failed += 1
+                    print(f"FAIL  {check.__name__}")
+                    traceback.print_exc()
+    print(f"{len(CHECKS) - failed}/{len(CHECKS)} 项通过")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,438 @@
+"""运行基准测试并输出JSON结果
+
+    python -m benchmarks.run                          # 运行全部场景，结果打印到标准输出
+    python -m benchmarks.run -s summarize -n 20000    # 只运行摘要生成，20000 篇文章
+    python -m benchmarks.run --output bench.json      # 结果写入文件，便于不同版本之间对比
+
+每次运行使用临时目录中的新数据库，不会影响 rss_feeds.db。RSS源由本地服务器提供，
+默认分布在多个回环地址（127.0.0.2、127.0.0.3 ...）上，模拟不同主机，
+避免所有请求都被同一主机的并发限制卡住。
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import random
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from . import feeds
+from .server import FeedServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app(database_path, journal_mode=None):
+    """在导入 app 之前指定临时数据库，journal_mode 在建立第一个连接之前设置"""
+    os.environ['RSS_DATABASE_URI'] = f"sqlite:///{database_path}"
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    import app as rss_app
+    if journal_mode:
+        rss_app.app.config['SQLITE_JOURNAL_MODE'] = journal_mode
+    rss_app.init_db()
+    return rss_app
+
+
+def reset_database(rss_app):
+    """清空RSS源和文章，包括 init_db 添加的默认源"""
+    db = rss_app.db
+    rss_app.ExtractionJob.query.delete()
+    rss_app.ArticleFingerprint.query.delete()
+    rss_app.ArticleAlternate.query.delete()
+    rss_app.Article.query.delete()
+    rss_app.RSSSource.query.delete()
+    rss_app.CategoryStat.query.delete()
+    # 摘要缓存也清空，每次运行都从头生成摘要
+    rss_app.SummaryCacheEntry.query.delete()
+    db.session.commit()
+    # 批量删除不会清理会话中的对象，新插入的行复用ID时会冲突
+    db.session.expunge_all()
+
+
+@contextmanager
+def count_statements(rss_app):
+    """统计代码块中执行的SQL语句数"""
+    from sqlalchemy import event
+    counter = {'statements': 0}
+
+    def before_execute(*args, **kwargs):
+        counter['statements'] += 1
+
+    engine = rss_app.db.engine
+    event.listen(engine, 'before_cursor_execute', before_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_execute)
+
+
+def source_host(server, index, hosts):
+    """把源分散到 hosts 个回环地址上"""
+    if hosts <= 1:
+        return server.base_url
+    port = server.httpd.server_address[1]
+    return f"http://127.0.0.{2 + index % hosts}:{port}"
+
+
+def add_sources(rss_app, server, names, hosts):
+    db = rss_app.db
+    for index, name in enumerate(names):
+        db.session.add(rss_app.RSSSource(
+            name=name,
+            url=f"{source_host(server, index, hosts)}/feeds/{name}",
+            category='graphics_programming' if index % 2 else 'game_engine_architecture'
+        ))
+    db.session.commit()
+
+
+def scenario_fetch_all(rss_app, server, args):
+    """fetch_all_sources：冷启动全量入库，然后是全部返回304的第二轮"""
+    names = [f"feed{i}" for i in range(args.sources)]
+    for index, name in enumerate(names):
+        fmt = 'atom' if index % 5 == 0 else 'rss'
+        server.add_feed(name, feeds.make_feed(name, args.entries, fmt=fmt, seed=args.seed),
+                        latency=args.latency, error_rate=args.error_rate)
+    add_sources(rss_app, server, names, args.hosts)
+
+    phases = {}
+    for phase in ('cold', 'not_modified'):
+        server.reset_stats()
+        with count_statements(rss_app) as counter:
+            started = time.perf_counter()
+            new_articles = rss_app.RSSFetcher.fetch_all_sources()
+            elapsed = time.perf_counter() - started
+        last_run = rss_app.RSSFetcher.last_run
+        phases[phase] = {
+            'seconds': round(elapsed, 4),
+            'sources_per_second': round(args.sources / elapsed, 2) if elapsed else None,
+            'new_articles': new_articles,
+            'successful': last_run.get('successful'),
+            'failed': last_run.get('failed'),
+            'unchanged': last_run.get('unchanged'),
+            'statements': counter['statements'],
+            'server': dict(server.stats)
+        }
+    return {
+        'params': {'sources': args.sources, 'entries': args.entries, 'latency': args.latency,
+                   'error_rate': args.error_rate, 'hosts': args.hosts,
+                   'workers': rss_app.app.config.get('RSS_FETCH_WORKERS'),
+                   'per_host': rss_app.app.config.get('RSS_FETCH_PER_HOST')},
+        'phases': phases
+    }
+
+
+def scenario_dedup(rss_app, server, args):
+    """fetch_articles 去重：每个源已入库一部分文章，再处理一份新旧混合的RSS
+
+    下载解析不计时，只测量去重和入库。
+    """
+    overlap = args.overlap
+    per_feed = 10  # 每个RSS源文档中的文章数
+    fresh = per_feed - int(per_feed * overlap)
+    names = [f"dedup{i}" for i in range(args.sources)]
+    for name in names:
+        server.add_feed(f"{name}-old", feeds.make_feed(name, per_feed, offset=fresh, seed=args.seed),
+                        conditional=False)
+        server.add_feed(name, feeds.make_feed(name, per_feed, offset=0, seed=args.seed),
+                        conditional=False)
+    add_sources(rss_app, server, names, args.hosts)
+    sources = rss_app.RSSSource.query.order_by(rss_app.RSSSource.id).all()
+
+    # 第一轮：入库旧的文章
+    for source in sources:
+        fetched = rss_app.RSSFetcher.download_feed(f"{source.url}-old")
+        rss_app.RSSFetcher.fetch_articles(source, fetched)
+
+    downloaded = [(source, rss_app.RSSFetcher.download_feed(source.url)) for source in sources]
+    with count_statements(rss_app) as counter:
+        started = time.perf_counter()
+        new_articles = sum(rss_app.RSSFetcher.fetch_articles(source, fetched) for source, fetched in downloaded)
+        elapsed = time.perf_counter() - started
+    return {
+        'params': {'sources': args.sources, 'entries_per_feed': per_feed, 'overlap': overlap},
+        'seconds': round(elapsed, 4),
+        'ms_per_source': round(elapsed * 1000 / len(sources), 3),
+        'new_articles': new_articles,
+        'expected_new_articles': fresh * len(sources),
+        'statements': counter['statements'],
+        'statements_per_source': round(counter['statements'] / len(sources), 2)
+    }
+
+
+def scenario_summarize(rss_app, server, args):
+    """generate_summary 逐篇生成摘要，以及 summarize_many 在不同进程数下批量生成"""
+    processor = rss_app.ContentProcessor
+    entries = feeds.make_entries('summary', args.summaries, seed=args.seed, cjk_ratio=args.cjk_ratio)
+    inputs = [(entry['title'], entry['description'], '') for entry in entries]
+
+    # 清空摘要生成的缓存，从冷启动开始计时；旧版本没有这些缓存时跳过
+    simplify_cache_clear = getattr(processor._simplify_to_chinese, 'cache_clear', None)
+    matcher = getattr(rss_app, 'KEYWORD_MATCHER', None)
+
+    def cache_clear():
+        if simplify_cache_clear:
+            simplify_cache_clear()
+        if matcher is not None and hasattr(matcher, 'clear'):
+            matcher.clear()
+
+    cache_clear()
+    started = time.perf_counter()
+    summaries = [processor.generate_summary(*item) for item in inputs]
+    elapsed = time.perf_counter() - started
+
+    # summarize_many 按 --processes 中的每个进程数各运行一次，比较进程池的扩展性
+    warmup = [(entry['title'], entry['description'], '')
+              for entry in feeds.make_entries('warmup', 200, seed=args.seed + 1, cjk_ratio=args.cjk_ratio)]
+    scaling = []
+    for processes in args.processes:
+        rss_app.SummaryPool.shutdown()
+        rss_app.app.config['SUMMARY_PROCESSES'] = processes
+        # 先启动子进程并完成导入，不计入耗时
+        processor.summarize_many(warmup)
+        cache_clear()
+        batch_started = time.perf_counter()
+        batch = processor.summarize_many(inputs)
+        batch_elapsed = time.perf_counter() - batch_started
+        scaling.append({
+            'processes': processes,
+            'seconds': round(batch_elapsed, 4),
+            'speedup': round(elapsed / batch_elapsed, 2),
+            'matches': batch == summaries
+        })
+    rss_app.SummaryPool.shutdown()
+    rss_app.app.config['SUMMARY_PROCESSES'] = args.processes[0]
+
+    digest = hashlib.sha256('\x00'.join(summaries).encode('utf-8')).hexdigest()
+    return {
+        'params': {'entries': len(inputs), 'cjk_ratio': args.cjk_ratio},
+        'seconds': round(elapsed, 4),
+        'us_per_entry': round(elapsed * 1e6 / len(inputs), 2),
+        'entries_per_second': round(len(inputs) / elapsed, 1),
+        'batch_seconds': scaling[0]['seconds'],
+        'batch_matches': all(run['matches'] for run in scaling),
+        'batch_scaling': scaling,
+        # 摘要内容的哈希，优化前后不同说明输出发生了变化
+        'output_sha256': digest
+    }
+
+
+class LockErrorCounter(logging.Handler):
+    """统计日志中出现的 database is locked 错误"""
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self.count = 0
+
+    def emit(self, record):
+        if 'database is locked' in record.getMessage() or (
+                record.exc_info and 'database is locked' in str(record.exc_info[1])):
+            self.count += 1
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def scenario_concurrency(rss_app, server, args):
+    """混合负载：一个线程不断抓取新文章，同时多个线程浏览页面、打开文章和标记已读
+
+    统计页面请求的错误数、日志中的 database is locked 次数和请求耗时。
+    出现 database is locked 时结果中的 failures 不为空，整个运行以非零状态退出。
+    """
+    names = [f"mixed{i}" for i in range(args.sources)]
+
+    def publish(round_number):
+        # 每一轮都换成全新的文章链接，保证每次抓取都有写入
+        for name in names:
+            server.add_feed(name, feeds.make_feed(name, args.entries, seed=round_number,
+                                                  offset=round_number * args.entries),
+                            latency=args.latency)
+
+    publish(0)
+    add_sources(rss_app, server, names, args.hosts)
+    rss_app.RSSFetcher.fetch_all_sources()
+
+    lock_errors = LockErrorCounter()
+    logging.getLogger().addHandler(lock_errors)
+    rss_app.app.logger.addHandler(lock_errors)
+    stop = threading.Event()
+    fetch_rounds = {'rounds': 0, 'new_articles': 0}
+
+    def fetch_loop():
+        round_number = 1
+        with rss_app.app.app_context():
+            while not stop.is_set():
+                publish(round_number)
+                fetch_rounds['new_articles'] += rss_app.RSSFetcher.fetch_all_sources()
+                fetch_rounds['rounds'] += 1
+                round_number += 1
+
+    def reader_loop(worker, results):
+        rng = random.Random(worker)
+        client = rss_app.app.test_client()
+        while not stop.is_set():
+            article_id = rng.randint(1, args.sources * args.entries)
+            action = rng.random()
+            if action < 0.5:
+                kind, call = 'list', lambda: client.get('/')
+            elif action < 0.8:
+                kind, call = 'article', lambda: client.get(f"/article/{article_id}")
+            else:
+                kind, call = 'mark_read', lambda: client.post(f"/mark_read/{article_id}")
+            started = time.perf_counter()
+            try:
+                status = call().status_code
+            except Exception:
+                status = 'exception'
+            results.append((kind, status, time.perf_counter() - started))
+
+    results_by_worker = [[] for _ in range(args.readers)]
+    threads = [threading.Thread(target=fetch_loop, name='bench-fetch')]
+    threads += [threading.Thread(target=reader_loop, args=(i, results_by_worker[i]), name=f"bench-reader-{i}")
+                for i in range(args.readers)]
+    writer_before = dict(rss_app.IngestWriter.stats)
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    logging.getLogger().removeHandler(lock_errors)
+    rss_app.app.logger.removeHandler(lock_errors)
+
+    results = [item for worker in results_by_worker for item in worker]
+    latencies = [elapsed for kind, status, elapsed in results if kind == 'list']
+    errors = [item for item in results if item[1] not in (200, 404)]
+    failures = []
+    if lock_errors.count:
+        failures.append(f"日志中出现 {lock_errors.count} 次 database is locked")
+    return {
+        'params': {'sources': args.sources, 'entries': args.entries, 'readers': args.readers,
+                   'duration': args.duration,
+                   'journal_mode': rss_app.app.config.get('SQLITE_JOURNAL_MODE')},
+        'requests': len(results),
+        'requests_per_second': round(len(results) / args.duration, 1),
+        'error_responses': len(errors),
+        'lock_errors': lock_errors.count,
+        'list_p50_ms': round(percentile(latencies, 0.5) * 1000, 2) if latencies else None,
+        'list_p95_ms': round(percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+        'list_max_ms': round(max(latencies) * 1000, 2) if latencies else None,
+        'fetch_rounds': fetch_rounds['rounds'],
+        'new_articles': fetch_rounds['new_articles'],
+        'writer_batches': rss_app.IngestWriter.stats['batches'] - writer_before.get('batches', 0),
+        'writer_tasks': rss_app.IngestWriter.stats['tasks'] - writer_before.get('tasks', 0),
+        'failures': failures
+    }
+
+
+SCENARIOS = {
+    'fetch_all': scenario_fetch_all,
+    'dedup': scenario_dedup,
+    'summarize': scenario_summarize,
+    'concurrency': scenario_concurrency
+}
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='RSS抓取和摘要生成基准测试')
+    parser.add_argument('-s', '--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='要运行的场景，可以重复指定，默认全部运行')
+    parser.add_argument('-o', '--output', help='结果JSON文件路径，默认输出到标准输出')
+    parser.add_argument('-r', '--repeat', type=int, default=1, help='每个场景重复运行的次数')
+    parser.add_argument('--sources', type=int, default=50, help='RSS源数量')
+    parser.add_argument('--entries', type=int, default=20, help='每个RSS源的文章数')
+    parser.add_argument('--latency', type=float, default=0.05, help='每个RSS源的响应延迟（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='RSS源返回500的概率')
+    parser.add_argument('--hosts', type=int, default=8, help='RSS源分布的回环地址数，1 表示全部使用 127.0.0.1')
+    parser.add_argument('--overlap', type=float, default=0.5, help='去重场景中已入库文章的比例')
+    parser.add_argument('-n', '--summaries', type=int, default=10000, help='摘要场景的文章数')
+    parser.add_argument('--cjk-ratio', type=float, default=0.3, help='生成中文内容的比例')
+    parser.add_argument('--processes', type=lambda value: [int(part) for part in value.split(',')], default=[0],
+                        help='SUMMARY_PROCESSES，逗号分隔多个值时摘要场景逐个比较，其他场景使用第一个值；0 表示在当前进程中执行')
+    parser.add_argument('--readers', type=int, default=4, help='并发场景中浏览页面的线程数')
+    parser.add_argument('--duration', type=float, default=10.0, help='并发场景的持续时间（秒）')
+    parser.add_argument('--journal-mode', help='覆盖 SQLITE_JOURNAL_MODE，例如 DELETE 用来对比 WAL')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-v', '--verbose', action='store_true', help='显示应用的INFO日志')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = args.scenario or list(SCENARIOS)
+
+    with tempfile.TemporaryDirectory(prefix='rss-bench-') as workdir:
+        # 先配置日志，app 中的 basicConfig 就不会再改成 INFO 级别
+        logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+        rss_app = load_app(os.path.join(workdir, 'bench.db'), args.journal_mode)
+        rss_app.app.config['SUMMARY_PROCESSES'] = args.processes[0]
+
+        results = {}
+        failures = []
+        with FeedServer(host='0.0.0.0' if args.hosts > 1 else '127.0.0.1', seed=args.seed) as server, \
+                rss_app.app.app_context():
+            for name in names:
+                runs = []
+                for attempt in range(args.repeat):
+                    reset_database(rss_app)
+                    print(f"[{name}] 第 {attempt + 1}/{args.repeat} 次", file=sys.stderr)
+                    runs.append(SCENARIOS[name](rss_app, server, args))
+                    failures += [f"[{name}] {failure}" for failure in runs[-1].get('failures', [])]
+                results[name] = runs[0] if args.repeat == 1 else summarize_runs(runs)
+                print(f"[{name}] {json.dumps(results[name], ensure_ascii=False)}", file=sys.stderr)
+
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scenarios': results,
+        'failures': failures
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    for failure in failures:
+        print(f"失败: {failure}", file=sys.stderr)
+    return report
+
+
+def summarize_runs(runs):
+    """多次运行时保留每次的结果，并给出耗时的中位数和最小值"""
+    summary = {'runs': runs}
+    timings = {}
+    for run in runs:
+        if 'seconds' in run:
+            timings.setdefault('seconds', []).append(run['seconds'])
+        for phase, result in run.get('phases', {}).items():
+            timings.setdefault(f"{phase}_seconds", []).append(result['seconds'])
+    for key, values in timings.items():
+        summary[f"median_{key}"] = round(statistics.median(values), 4)
+        summary[f"min_{key}"] = round(min(values), 4)
+    return summary
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main()['failures'] else 0)
@@ -0,0 +1,127 @@
+"""本地RSS源服务器，代替真实网站参与基准测试
+
+每个源可以单独配置响应延迟、出错概率和是否支持条件请求（ETag / 304），
+服务器统计收到的请求、304响应、错误和发送的字节数。
+"""
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FeedServer:
+    def __init__(self, host='127.0.0.1', port=0, seed=0):
+        self.feeds = {}
+        self.pages = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self.stats = {}
+        self.reset_stats()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def feed_url(self, name):
+        return f"{self.base_url}/feeds/{name}"
+
+    def add_feed(self, name, body, latency=0.0, error_rate=0.0, conditional=True):
+        """注册一个源；conditional=False 时不返回 ETag，也不响应 304"""
+        self.feeds[name] = {
+            'body': body,
+            'etag': '"%s"' % hashlib.md5(body).hexdigest(),
+            'latency': latency,
+            'error_rate': error_rate,
+            'conditional': conditional
+        }
+
+    def add_page(self, name, html, latency=0.0):
+        self.pages[name] = {'body': html.encode('utf-8'), 'latency': latency}
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {'requests': 0, 'not_modified': 0, 'errors': 0, 'bytes': 0}
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _should_fail(self, rate):
+        if not rate:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            wbufsize = -1  # 响应头和响应体一起发送，避免keep-alive连接上的延迟确认
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=b'', headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+                self.wfile.flush()
+                server._count('bytes', len(body))
+
+            def do_GET(self):
+                server._count('requests')
+                path = self.path.split('?', 1)[0]
+                kind, _, name = path.strip('/').partition('/')
+                if kind == 'pages' and name in server.pages:
+                    page = server.pages[name]
+                    time.sleep(page['latency'])
+                    self._send(200, page['body'], {'Content-Type': 'text/html; charset=utf-8'})
+                    return
+
+                feed = server.feeds.get(name) if kind == 'feeds' else None
+                if feed is None:
+                    server._count('errors')
+                    self._send(404)
+                    return
+
+                time.sleep(feed['latency'])
+                if server._should_fail(feed['error_rate']):
+                    server._count('errors')
+                    self._send(500, b'injected error')
+                    return
+
+                headers = {'Content-Type': 'application/rss+xml; charset=utf-8'}
+                if feed['conditional']:
+                    headers['ETag'] = feed['etag']
+                    if self.headers.get('If-None-Match') == feed['etag']:
+                        server._count('not_modified')
+                        self._send(304, headers=headers)
+                        return
+                self._send(200, feed['body'], headers)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='bench-feed-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()